@@ -0,0 +1,146 @@
+"""Measure per-call CLI latency with and without the resident daemon.
+
+A synthetic payload is recorded into a temporary corpus so that no call
+touches the network. The script then times ``--calls`` invocations of
+``python -m downloader URL --json`` resolved in process (``--no-daemon``) and
+through a daemon replaying the same corpus, the cost a live in-process call
+adds on top (importing ``yt_dlp`` and building a ``YoutubeDL``), and how long
+an idle daemon takes to exit::
+
+    python benchmarks/bench_cli_daemon.py --calls 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from downloader import daemon
+from downloader.core import PayloadStore
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+_YTDLP_COST = """
+import json, time
+started = time.perf_counter()
+from yt_dlp import YoutubeDL
+imported = time.perf_counter()
+with YoutubeDL({"quiet": True}):
+    pass
+built = time.perf_counter()
+print(json.dumps({"import_ms": (imported - started) * 1000, "construct_ms": (built - imported) * 1000}))
+"""
+
+
+def _payload() -> Dict[str, object]:
+    formats = [
+        {
+            "format_id": str(itag),
+            "url": f"https://rr1.googlevideo.com/videoplayback?expire={int(time.time()) + 3600}&itag={itag}",
+            "ext": "mp4",
+            "vcodec": "avc1.4d401e",
+            "acodec": "none",
+            "height": height,
+            "tbr": 500.0 + height,
+        }
+        for itag, height in ((133, 240), (134, 360), (135, 480), (136, 720), (137, 1080))
+    ]
+    formats.append({"format_id": "140", "url": formats[0]["url"], "ext": "m4a", "vcodec": "none", "acodec": "mp4a.40.2"})
+    return {"title": "Benchmark", "webpage_url": URL, "extractor_key": "Youtube", "formats": formats}
+
+
+def _time_calls(command: List[str], env: Dict[str, str], calls: int) -> List[float]:
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        subprocess.run(command, env=env, check=True, stdout=subprocess.DEVNULL, cwd=ROOT)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "median_ms": round(statistics.median(ordered), 1),
+        "p90_ms": round(ordered[int(0.9 * (len(ordered) - 1))], 1),
+        "min_ms": round(ordered[0], 1),
+    }
+
+
+def _wait_for_socket(path: Path, *, present: bool, timeout: float) -> float:
+    started = time.monotonic()
+    while time.monotonic() - started < timeout:
+        if path.exists() == present:
+            return time.monotonic() - started
+        time.sleep(0.01)
+    raise TimeoutError(f"Socket {path} did not {'appear' if present else 'disappear'} in {timeout}s")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--idle-timeout", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus = Path(workdir) / "corpus"
+        socket_path = Path(workdir) / "bench.sock"
+        PayloadStore(corpus).put(URL, _payload())
+        env = dict(os.environ, PYTHONPATH=str(ROOT), **{daemon.SOCKET_ENV: str(socket_path)})
+        env.pop("DOWNLOADER_NO_DAEMON", None)
+        cli = [sys.executable, "-m", "downloader", URL, "--json"]
+
+        in_process = _time_calls(cli + ["--no-daemon", "--extractor", "replay", "--corpus", str(corpus)], env, args.calls)
+
+        server = subprocess.Popen(
+            [sys.executable, "-m", "downloader.daemon", "--socket", str(socket_path), "--extractor", "replay",
+             "--corpus", str(corpus), "--idle-timeout", str(args.idle_timeout)],
+            env=env,
+            cwd=ROOT,
+        )
+        try:
+            _wait_for_socket(socket_path, present=True, timeout=30)
+            via_daemon = _time_calls(cli, env, args.calls)
+            last_request = time.monotonic()
+            server.wait(timeout=args.idle_timeout + 30)
+            idle_exit = time.monotonic() - last_request
+        finally:
+            if server.poll() is None:
+                server.kill()
+
+        ytdlp = json.loads(
+            subprocess.run([sys.executable, "-c", _YTDLP_COST], check=True, capture_output=True, text=True).stdout
+        )
+
+    replay = _summary(in_process)
+    overhead = {key: round(value, 1) for key, value in ytdlp.items()}
+    results = {
+        "calls": args.calls,
+        "in_process_replay": replay,
+        "daemon": _summary(via_daemon),
+        "live_in_process_overhead": overhead,
+        # A live call without the daemon pays both on top of the replayed one
+        # (network time excluded).
+        "live_in_process_estimate_median_ms": round(replay["median_ms"] + sum(overhead.values()), 1),
+        "idle_timeout_s": args.idle_timeout,
+        "idle_exit_after_s": round(idle_exit, 2),
+        "socket_removed": not socket_path.exists(),
+    }
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
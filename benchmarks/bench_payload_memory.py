@@ -0,0 +1,161 @@
+"""Measure per-request memory of raw versus pruned ``yt-dlp`` payloads.
+
+Each mode runs in a fresh interpreter that builds ``--concurrency`` synthetic
+payloads shaped like a real YouTube ``extract_info`` result, keeps them alive
+while :class:`MediaService` converts them (as concurrent requests would) and
+reports the peak RSS growth and the ``tracemalloc`` peak per request::
+
+    python benchmarks/bench_payload_memory.py --concurrency 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import threading
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from downloader.core.ytdlp import prune_payload
+from downloader.services import MediaService
+
+
+def build_payload(seed: int) -> Dict[str, Any]:
+    """Return a synthetic payload with the bulky sections yt-dlp produces."""
+
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Linux; Android 11) AppleWebKit/537.36 Chrome/120.0 Mobile Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "en-us,en;q=0.5",
+        "Sec-Fetch-Mode": "navigate",
+    }
+    formats = []
+    for index in range(60):
+        video = index % 3 != 0
+        formats.append(
+            {
+                "format_id": f"{seed}-{index}",
+                "format_note": f"{144 * (index % 8 + 1)}p",
+                "url": f"https://rr1.googlevideo.com/videoplayback?expire=1700000000&id={seed}&itag={index}&"
+                + "sig=" + "a" * 300,
+                "ext": "mp4" if video else "m4a",
+                "vcodec": "avc1.4d401e" if video else "none",
+                "acodec": "none" if video else "mp4a.40.2",
+                "width": 1920 if video else None,
+                "height": 1080 if video else None,
+                "fps": 30 if video else None,
+                "tbr": 1000.5 + index,
+                "filesize": 10_000_000 + index,
+                "http_headers": dict(headers),
+                "downloader_options": {"http_chunk_size": 10485760},
+                "fragments": [{"url": f"sq/{n}", "duration": 5.0} for n in range(20)],
+                "quality": index,
+                "has_drm": False,
+                "protocol": "https",
+                "container": "mp4_dash",
+            }
+        )
+    return {
+        "id": f"video{seed}",
+        "title": f"Synthetic video {seed}",
+        "webpage_url": f"https://www.youtube.com/watch?v=video{seed}",
+        "extractor_key": "Youtube",
+        "description": "lorem ipsum " * 400,
+        "formats": formats,
+        "thumbnails": [
+            {"url": f"https://i.ytimg.com/vi/video{seed}/{n}.jpg", "width": 120, "height": 90, "id": str(n)}
+            for n in range(40)
+        ],
+        "automatic_captions": {
+            f"lang{lang}": [
+                {"ext": ext, "url": f"https://www.youtube.com/api/timedtext?v=video{seed}&lang={lang}&fmt={ext}&" + "x" * 200}
+                for ext in ("json3", "srv1", "srv2", "srv3", "ttml", "vtt")
+            ]
+            for lang in range(150)
+        },
+        "heatmap": [{"start_time": n, "end_time": n + 1, "value": 0.5} for n in range(100)],
+        "chapters": [{"start_time": n * 60, "end_time": n * 60 + 60, "title": f"Chapter {n}"} for n in range(20)],
+        "tags": [f"tag{n}" for n in range(30)],
+    }
+
+
+class _SyntheticExtractor:
+    def __init__(self, *, prune: bool, barrier: threading.Barrier) -> None:
+        self._prune = prune
+        self._barrier = barrier
+        self._seed = 0
+        self._lock = threading.Lock()
+
+    def extract(self, url: str, cookies: str | None = None, deadline: Any = None) -> Dict[str, Any]:
+        with self._lock:
+            self._seed += 1
+            seed = self._seed
+        payload = build_payload(seed)
+        if self._prune:
+            payload = prune_payload(payload)
+        # Hold every payload alive at the same time, like overlapping requests.
+        self._barrier.wait()
+        return payload
+
+
+def _measure(mode: str, concurrency: int) -> Dict[str, Any]:
+    barrier = threading.Barrier(concurrency)
+    service = MediaService(_SyntheticExtractor(prune=mode == "pruned", barrier=barrier))
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    threads = [
+        threading.Thread(target=service.get_media, args=(f"https://www.youtube.com/watch?v={n}",))
+        for n in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        # ``ru_maxrss`` is reported in KiB on Linux.
+        "peak_rss_growth_kib": peak_rss - baseline_rss,
+        "traced_peak_per_request_kib": round(peak / concurrency / 1024, 1),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mode", choices=("full", "pruned"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.mode:
+        print(json.dumps(_measure(args.mode, args.concurrency)))
+        return 0
+
+    results = {}
+    for mode in ("full", "pruned"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--concurrency", str(args.concurrency)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[mode] = json.loads(output)
+    full = results["full"]["traced_peak_per_request_kib"]
+    pruned = results["pruned"]["traced_peak_per_request_kib"]
+    results["reduction_pct"] = round(100 * (1 - pruned / full), 1) if full else None
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
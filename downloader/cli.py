@@ -4,20 +4,46 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+import sys
 from typing import Iterable
 
-from .core import MediaStream
+from . import daemon
+from .core import MediaResult, MediaStream, PayloadStore
+from .core.replay import build_extractor
 from .services import MediaService
 
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Inspect downloadable media streams.")
-    parser.add_argument("url", help="Video URL supported by yt-dlp.")
+    parser.add_argument("url", nargs="?", help="Video URL supported by yt-dlp.")
     parser.add_argument(
         "--json",
         action="store_true",
         help="Output structured JSON instead of a human-readable table.",
     )
+    parser.add_argument(
+        "--extractor",
+        choices=("live", "record", "replay"),
+        default="live",
+        help="Query yt-dlp, query it and record the payload, or replay a recorded payload offline.",
+    )
+    parser.add_argument("--corpus", metavar="DIR", help="Payload corpus for --extractor record/replay.")
+    parser.add_argument(
+        "--import-corpus",
+        metavar="ARCHIVE",
+        help="Merge a corpus archive into --corpus before anything else.",
+    )
+    parser.add_argument(
+        "--export-corpus",
+        metavar="ARCHIVE",
+        help="Write --corpus to an archive after anything else.",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Resolve in this process even if a daemon is running (also DOWNLOADER_NO_DAEMON=1).",
+    )
     return parser
 
 
@@ -57,12 +83,23 @@ def main(argv: list[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
 
-    service = MediaService()
+    if (args.extractor != "live" or args.import_corpus or args.export_corpus) and not args.corpus:
+        parser.error("--corpus is required to record, replay, import or export payloads")
+    if not args.url and not (args.import_corpus or args.export_corpus):
+        parser.error("the following arguments are required: url")
+
+    if args.import_corpus:
+        added = PayloadStore(args.corpus).import_archive(args.import_corpus)
+        print(f"Imported {added} payload(s) into {args.corpus}", file=sys.stderr)
+    if not args.url:
+        return _export_corpus(args)
+
     try:
-        result = service.get_media(args.url)
+        result = _resolve(args)
     except Exception as exc:  # pragma: no cover - propagate extractor errors
         parser.error(str(exc))
         return 2
+    _export_corpus(args)
 
     if args.json:
         print(json.dumps(result.to_dict(), ensure_ascii=False, indent=2))
@@ -75,3 +112,33 @@ def main(argv: list[str] | None = None) -> int:
     print()
     print(describe_streams("Audio", result.audio_streams))
     return 0
+
+
+def _resolve(args: argparse.Namespace) -> MediaResult:
+    """Ask a running daemon for the result, or extract it in this process."""
+
+    if _use_daemon(args):
+        try:
+            return daemon.lookup(args.url)
+        except daemon.DaemonUnavailable:
+            pass
+    return _resolve_locally(args)
+
+
+def _resolve_locally(args: argparse.Namespace) -> MediaResult:
+    service = MediaService(build_extractor(args.extractor, args.corpus))
+    return service.get_media(args.url)
+
+
+def _use_daemon(args: argparse.Namespace) -> bool:
+    # The daemon owns its own extractor, so only plain live lookups go there.
+    if args.no_daemon or os.environ.get("DOWNLOADER_NO_DAEMON", "") not in {"", "0"}:
+        return False
+    return args.extractor == "live" and not args.corpus
+
+
+def _export_corpus(args: argparse.Namespace) -> int:
+    if args.export_corpus:
+        count = PayloadStore(args.corpus).export_archive(args.export_corpus)
+        print(f"Exported {count} payload(s) to {args.export_corpus}", file=sys.stderr)
+    return 0
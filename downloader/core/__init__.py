@@ -1,10 +1,18 @@
 """Core domain models and extractor integrations."""
 
+from .deadline import Deadline, DeadlineExceeded
 from .models import MediaResult, MediaStream
+from .replay import PayloadStore, RecordingExtractor, ReplayExtractor, ReplayMissError
 from .ytdlp import YtDlpExtractor
 
 __all__ = [
+    "Deadline",
+    "DeadlineExceeded",
     "MediaResult",
     "MediaStream",
+    "PayloadStore",
+    "RecordingExtractor",
+    "ReplayExtractor",
+    "ReplayMissError",
     "YtDlpExtractor",
 ]
@@ -0,0 +1,53 @@
+"""Cooperative deadlines for long-running extractions."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when work is abandoned because its deadline passed or it was cancelled."""
+
+
+class Deadline:
+    """Time budget shared between the caller and the thread doing the work.
+
+    The worker polls :meth:`check` at safe points (before network requests,
+    between processing steps); the caller may :meth:`cancel` at any time, for
+    example when the client that asked for the result has gone away.
+    """
+
+    def __init__(self, timeout: float) -> None:
+        self._expires_at = time.monotonic() + timeout
+        self._cancelled = threading.Event()
+        self._reason = ""
+
+    def remaining(self) -> float:
+        """Seconds left before expiry; ``0.0`` once expired or cancelled."""
+
+        if self._cancelled.is_set():
+            return 0.0
+        return max(0.0, self._expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """Ask the worker to stop at its next :meth:`check`."""
+
+        self._reason = reason
+        self._cancelled.set()
+
+    def check(self) -> None:
+        """Raise :class:`DeadlineExceeded` if the work should be abandoned."""
+
+        if self._cancelled.is_set():
+            raise DeadlineExceeded(f"Extraction abandoned: {self._reason}")
+        if self._expires_at <= time.monotonic():
+            raise DeadlineExceeded("Extraction deadline exceeded")
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import parse_qs, urlsplit
 
 
 @dataclass(slots=True)
@@ -35,6 +36,27 @@ class MediaStream:
             payload["extra"] = self.extra
         return payload
 
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "MediaStream":
+        """Rebuild a stream from the output of :meth:`to_dict`."""
+
+        return cls(
+            format_id=payload["format_id"],
+            mime_type=payload["mime_type"],
+            resolution=payload.get("resolution"),
+            bitrate_kbps=payload.get("bitrate_kbps"),
+            fps=payload.get("fps"),
+            filesize_bytes=payload.get("filesize_bytes"),
+            url=payload["url"],
+            extra=dict(payload.get("extra") or {}),
+        )
+
+    @property
+    def expires_at(self) -> Optional[int]:
+        """Unix timestamp after which :attr:`url` stops working, if known."""
+
+        return _parse_expiry(self.url)
+
 
 @dataclass(slots=True)
 class MediaResult:
@@ -51,6 +73,14 @@ class MediaResult:
         yield from self.video_streams
         yield from self.audio_streams
 
+    @property
+    def expires_at(self) -> Optional[int]:
+        """Earliest expiry among all stream URLs, if any of them advertise one."""
+
+        expiries = [stream.expires_at for stream in self.iter_streams()]
+        known = [value for value in expiries if value is not None]
+        return min(known) if known else None
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert the result to primitive Python objects."""
 
@@ -60,3 +90,34 @@ class MediaResult:
             "video_streams": [stream.to_dict() for stream in self.video_streams],
             "audio_streams": [stream.to_dict() for stream in self.audio_streams],
         }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "MediaResult":
+        """Rebuild a result from the output of :meth:`to_dict`."""
+
+        return cls(
+            title=payload.get("title") or "",
+            page_url=payload["page_url"],
+            video_streams=[MediaStream.from_dict(item) for item in payload.get("video_streams") or []],
+            audio_streams=[MediaStream.from_dict(item) for item in payload.get("audio_streams") or []],
+        )
+
+
+def _parse_expiry(url: str) -> Optional[int]:
+    """Extract the ``expire`` timestamp signed into CDN URLs such as googlevideo."""
+
+    parts = urlsplit(url)
+    values = parse_qs(parts.query).get("expire")
+    if not values:
+        # Manifest-style URLs carry parameters as path segments: ``/expire/<ts>/``.
+        segments = parts.path.split("/")
+        for index, segment in enumerate(segments[:-1]):
+            if segment == "expire":
+                values = [segments[index + 1]]
+                break
+    if not values:
+        return None
+    try:
+        return int(values[0])
+    except ValueError:
+        return None
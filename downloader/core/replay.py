@@ -0,0 +1,298 @@
+"""Recording and replaying raw extractor payloads.
+
+Payloads are kept in a content-addressed :class:`PayloadStore`: every distinct
+payload is written once as gzip-compressed JSON named after its SHA-256, and
+an index maps the canonical identity of each recorded URL to its payload.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import tarfile
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List
+
+from .deadline import Deadline
+from .urls import canonicalize_url
+
+if TYPE_CHECKING:  # pragma: no cover - import cycle guard
+    from ..services.media import MediaExtractor
+
+_INDEX_NAME = "index.json"
+_OBJECT_NAME = re.compile(r"^objects/[0-9a-f]{2}/[0-9a-f]{64}\.json\.gz$")
+_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+_EXPIRY = re.compile(r"([?&/]expire[=/])(\d+)")
+
+
+class ReplayMissError(LookupError):
+    """Raised when a URL has no recorded payload."""
+
+
+class PayloadStore:
+    """Content-addressed directory of compressed payloads."""
+
+    def __init__(self, directory: str | os.PathLike[str]) -> None:
+        self._directory = Path(directory)
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Any]] | None = None
+        self._index_stamp: tuple[int, int, int] | None = None
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    def put(self, url: str, payload: Dict[str, Any]) -> str:
+        """Record *payload* for *url* and return its digest."""
+
+        data = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_write(path, gzip.compress(data, mtime=0))
+        with self._lock:
+            index = self._load_index()
+            index[canonicalize_url(url).cache_key] = {"url": url, "digest": digest, "recorded_at": int(time.time())}
+            self._save_index(index)
+        return digest
+
+    def get(self, url: str) -> Dict[str, Any]:
+        """Return the payload recorded for *url* (or any URL equivalent to it)."""
+
+        return self.read(self.entry(url)["digest"])
+
+    def entry(self, url: str) -> Dict[str, Any]:
+        """Return the index entry (``url``, ``digest``, ``recorded_at``) for *url*."""
+
+        with self._lock:
+            entry = self._load_index().get(canonicalize_url(url).cache_key)
+        if entry is None:
+            raise ReplayMissError(f"No recorded payload for {url}")
+        return dict(entry)
+
+    def read(self, digest: str) -> Dict[str, Any]:
+        """Return the payload stored under *digest*."""
+
+        if not _DIGEST.match(digest):
+            raise ValueError(f"Invalid payload digest: {digest!r}")
+        return json.loads(gzip.decompress(self._object_path(digest).read_bytes()).decode("utf-8"))
+
+    def urls(self) -> List[str]:
+        """The recorded URLs, in recording order."""
+
+        with self._lock:
+            entries = sorted(self._load_index().values(), key=lambda entry: entry["recorded_at"])
+        return [entry["url"] for entry in entries]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load_index())
+
+    def export_archive(self, path: str | os.PathLike[str]) -> int:
+        """Write the index and every referenced payload to a tar archive."""
+
+        with self._lock:
+            index = dict(self._load_index())
+        with tarfile.open(path, "w") as archive:
+            for digest in sorted({entry["digest"] for entry in index.values()}):
+                archive.add(self._object_path(digest), arcname=self._object_name(digest))
+            data = json.dumps(index, indent=2, sort_keys=True).encode("utf-8")
+            info = tarfile.TarInfo(_INDEX_NAME)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            archive.addfile(info, io.BytesIO(data))
+        return len(index)
+
+    def import_archive(self, path: str | os.PathLike[str], *, overwrite: bool = False) -> int:
+        """Merge an archive written by :meth:`export_archive` into this store.
+
+        Existing entries win unless *overwrite* is set. Returns the number of
+        index entries added or replaced.
+        """
+
+        imported: Dict[str, Dict[str, Any]] = {}
+        with tarfile.open(path, "r") as archive:
+            for member in archive.getmembers():
+                if not member.isfile():
+                    continue
+                handle = archive.extractfile(member)
+                if handle is None:
+                    continue
+                if member.name == _INDEX_NAME:
+                    imported = json.loads(handle.read().decode("utf-8"))
+                elif _OBJECT_NAME.match(member.name):
+                    compressed = handle.read()
+                    digest = Path(member.name).name.split(".", 1)[0]
+                    if hashlib.sha256(gzip.decompress(compressed)).hexdigest() != digest:
+                        raise ValueError(f"Corrupt payload in archive: {member.name}")
+                    target = self._object_path(digest)
+                    if not target.exists():
+                        target.parent.mkdir(parents=True, exist_ok=True)
+                        _atomic_write(target, compressed)
+
+        # Digests end up in file paths, so the imported index is not trusted.
+        if not isinstance(imported, dict):
+            raise ValueError("Corrupt index in archive")
+        for key, entry in imported.items():
+            if not _valid_entry(entry):
+                raise ValueError(f"Corrupt index entry in archive: {key}")
+
+        changed = 0
+        with self._lock:
+            index = self._load_index()
+            for key, entry in imported.items():
+                if not self._object_path(entry["digest"]).exists():
+                    continue
+                if key in index and not overwrite:
+                    continue
+                index[key] = entry
+                changed += 1
+            self._save_index(index)
+        return changed
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _object_name(digest: str) -> str:
+        return f"objects/{digest[:2]}/{digest}.json.gz"
+
+    def _object_path(self, digest: str) -> Path:
+        return self._directory / self._object_name(digest)
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        # Reload whenever the file was replaced, e.g. by an import from another
+        # process, so long-running replay servers see new recordings.
+        stamp = self._stat_index()
+        if self._index is None or stamp != self._index_stamp:
+            path = self._directory / _INDEX_NAME
+            self._index = json.loads(path.read_text(encoding="utf-8")) if stamp is not None else {}
+            self._index_stamp = stamp
+        return self._index
+
+    def _save_index(self, index: Dict[str, Dict[str, Any]]) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(index, indent=2, sort_keys=True).encode("utf-8")
+        _atomic_write(self._directory / _INDEX_NAME, data)
+        self._index_stamp = self._stat_index()
+
+    def _stat_index(self) -> tuple[int, int, int] | None:
+        try:
+            info = os.stat(self._directory / _INDEX_NAME)
+        except FileNotFoundError:
+            return None
+        return (info.st_ino, info.st_mtime_ns, info.st_size)
+
+
+class RecordingExtractor:
+    """Delegate to *inner* and record every anonymous payload it returns.
+
+    Lookups with cookies may be personalised, so they are never recorded
+    under the shared canonical key.
+    """
+
+    def __init__(self, inner: "MediaExtractor", store: PayloadStore) -> None:
+        self._inner = inner
+        self._store = store
+
+    def extract(
+        self,
+        url: str,
+        cookies: str | None = None,
+        deadline: Deadline | None = None,
+    ) -> Dict[str, Any]:
+        payload = self._inner.extract(url, cookies=cookies, deadline=deadline)
+        if not cookies:
+            self._store.put(url, payload)
+        return payload
+
+
+class ReplayExtractor:
+    """Serve recorded payloads without any network I/O.
+
+    By default recordings are served unchanged, so expired links look
+    expired. With *shift_expiry* (load tests, benchmarks) the signed
+    ``expire`` parameters of the stream URLs are moved forward by the time
+    elapsed since recording, so caches treat replayed results like fresh
+    ones; the shifted links no longer work at the CDN.
+    """
+
+    def __init__(self, store: PayloadStore, *, shift_expiry: bool = False) -> None:
+        self._store = store
+        self._shift_expiry = shift_expiry
+
+    def extract(
+        self,
+        url: str,
+        cookies: str | None = None,
+        deadline: Deadline | None = None,
+    ) -> Dict[str, Any]:
+        if deadline is not None:
+            deadline.check()
+        entry = self._store.entry(url)
+        payload = self._store.read(entry["digest"])
+        if self._shift_expiry:
+            delta = max(0, int(time.time()) - int(entry["recorded_at"]))
+            _shift_format_expiry(payload, delta)
+        return payload
+
+
+def build_extractor(mode: str = "live", corpus_dir: str | os.PathLike[str] | None = None) -> "MediaExtractor":
+    """Create the extractor for *mode*: ``live``, ``record`` or ``replay``."""
+
+    if mode == "live":
+        from .ytdlp import YtDlpExtractor
+
+        return YtDlpExtractor()
+    if mode not in {"record", "replay"}:
+        raise ValueError(f"Unsupported extractor mode: {mode}")
+    if not corpus_dir:
+        raise ValueError(f"Extractor mode {mode!r} requires a corpus directory")
+    store = PayloadStore(corpus_dir)
+    if mode == "replay":
+        return ReplayExtractor(store)
+    from .ytdlp import YtDlpExtractor
+
+    return RecordingExtractor(YtDlpExtractor(), store)
+
+
+def _valid_entry(entry: Any) -> bool:
+    if not isinstance(entry, dict):
+        return False
+    digest, url, recorded_at = entry.get("digest"), entry.get("url"), entry.get("recorded_at")
+    return (
+        isinstance(digest, str)
+        and bool(_DIGEST.match(digest))
+        and isinstance(url, str)
+        and bool(url)
+        and isinstance(recorded_at, (int, float))
+        and not isinstance(recorded_at, bool)
+    )
+
+
+def _shift_format_expiry(payload: Dict[str, Any], delta: int) -> None:
+    if not delta:
+        return
+    for fmt in payload.get("formats") or []:
+        url = fmt.get("url")
+        if isinstance(url, str):
+            fmt["url"] = _EXPIRY.sub(lambda match: f"{match.group(1)}{int(match.group(2)) + delta}", url)
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    handle, temp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(handle, "wb") as stream:
+            stream.write(data)
+        os.replace(temp_name, path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
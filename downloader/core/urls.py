@@ -0,0 +1,92 @@
+"""Canonical identities for media page URLs."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+_YOUTUBE_ID = re.compile(r"^[0-9A-Za-z_-]{11}$")
+_YOUTUBE_HOSTS = frozenset(
+    {
+        "youtube.com",
+        "www.youtube.com",
+        "m.youtube.com",
+        "music.youtube.com",
+        "youtube-nocookie.com",
+        "www.youtube-nocookie.com",
+    }
+)
+_YOUTUBE_PATH_PREFIXES = ("shorts", "embed", "live", "v", "e")
+_VIMEO_HOSTS = frozenset({"vimeo.com", "www.vimeo.com"})
+
+
+@dataclass(frozen=True, slots=True)
+class CanonicalURL:
+    """A media URL reduced to the identity ``yt-dlp`` cares about."""
+
+    url: str
+    extractor_key: Optional[str] = None
+    media_id: Optional[str] = None
+
+    @property
+    def cache_key(self) -> str:
+        """Key under which results for this URL may be shared."""
+
+        if self.extractor_key and self.media_id:
+            return f"{self.extractor_key}:{self.media_id}"
+        return self.url
+
+
+def canonicalize_url(url: str) -> CanonicalURL:
+    """Map *url* to its canonical form.
+
+    Known URL shapes (``youtu.be/ID``, ``m.youtube.com``, ``/shorts/ID``,
+    tracking or timestamp parameters, ...) resolve to a single canonical page
+    URL together with the ``yt-dlp`` extractor key and media ID. Unknown hosts
+    are returned untouched, without an extractor key.
+    """
+
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return CanonicalURL(url=url)
+    host = (parts.hostname or "").lower()
+    path = [segment for segment in parts.path.split("/") if segment]
+
+    for matcher in _MATCHERS:
+        match = matcher(host, path, parts.query)
+        if match:
+            extractor_key, media_id, canonical = match
+            return CanonicalURL(url=canonical, extractor_key=extractor_key, media_id=media_id)
+    return CanonicalURL(url=url)
+
+
+def _match_youtube(host: str, path: list[str], query: str) -> Optional[Tuple[str, str, str]]:
+    media_id: Optional[str] = None
+    if host == "youtu.be":
+        media_id = path[0] if path else None
+    elif host in _YOUTUBE_HOSTS:
+        if path == ["watch"]:
+            media_id = (parse_qs(query).get("v") or [None])[0]
+        elif len(path) >= 2 and path[0] in _YOUTUBE_PATH_PREFIXES:
+            media_id = path[1]
+    if not media_id or not _YOUTUBE_ID.match(media_id):
+        return None
+    return "Youtube", media_id, f"https://www.youtube.com/watch?v={media_id}"
+
+
+def _match_vimeo(host: str, path: list[str], query: str) -> Optional[Tuple[str, str, str]]:
+    if host not in _VIMEO_HOSTS:
+        return None
+    # Private links carry an extra hash segment, so only bare IDs are mapped.
+    if len(path) != 1 or not path[0].isdigit():
+        return None
+    return "Vimeo", path[0], f"https://vimeo.com/{path[0]}"
+
+
+_MATCHERS: Tuple[Callable[[str, list[str], str], Optional[Tuple[str, str, str]]], ...] = (
+    _match_youtube,
+    _match_vimeo,
+)
@@ -7,9 +7,56 @@ from __future__ import annotations
 from contextlib import suppress
 from pathlib import Path
 from tempfile import NamedTemporaryFile
-from typing import Any, Dict
-
-from yt_dlp import YoutubeDL
+from typing import Any, Callable, Dict, FrozenSet
+
+from .deadline import Deadline, DeadlineExceeded
+from .urls import canonicalize_url
+
+#: Per-socket-operation timeout (seconds) when no tighter deadline applies.
+DEFAULT_SOCKET_TIMEOUT = 10.0
+#: Upper bounds for ``yt-dlp``'s HTTP and extractor retry loops.
+DEFAULT_RETRIES = 3
+DEFAULT_EXTRACTOR_RETRIES = 2
+
+# Keys of the ``extract_info`` result that downstream code reads. Everything
+# else (thumbnails, automatic captions, heatmaps, chapters, ...) is dropped
+# right after extraction so the bulk of the payload can be freed early.
+PAYLOAD_KEYS: FrozenSet[str] = frozenset(
+    {
+        "_type",
+        "id",
+        "title",
+        "url",
+        "webpage_url",
+        "original_url",
+        "extractor_key",
+        "duration",
+        "formats",
+    }
+)
+
+# Keys of every entry in ``formats`` used to build :class:`MediaStream` objects.
+FORMAT_KEYS: FrozenSet[str] = frozenset(
+    {
+        "format_id",
+        "format",
+        "format_note",
+        "url",
+        "ext",
+        "vcodec",
+        "acodec",
+        "width",
+        "height",
+        "resolution",
+        "fps",
+        "tbr",
+        "vbr",
+        "abr",
+        "filesize",
+        "filesize_approx",
+        "dynamic_range",
+    }
+)
 
 
 class YtDlpExtractor:
@@ -19,11 +66,35 @@ class YtDlpExtractor:
         """Initializes the extractor with default options."""
         self._options: Dict[str, Any] = _build_default_options()
 
-    def extract(self, url: str, cookies: str | None = None) -> Dict[str, Any]:
-        """Fetch raw metadata for *url* using ``yt-dlp``."""
+    def preload(self) -> None:
+        """Import ``yt-dlp`` and build a client once, so later calls start warm."""
+        with _youtube_dl_class()(self._options.copy()):
+            pass
+
+    def extract(
+        self,
+        url: str,
+        cookies: str | None = None,
+        deadline: Deadline | None = None,
+    ) -> Dict[str, Any]:
+        """Fetch raw metadata for *url* using ``yt-dlp``.
+
+        Recognised URLs are rewritten to their canonical form and dispatched
+        straight to the matching extractor, skipping ``yt-dlp``'s scan over
+        every registered extractor. Unknown URLs go through the full scan.
+
+        With a *deadline*, socket timeouts and retry counts are sized to the
+        remaining budget and the deadline is checked before every HTTP request
+        ``yt-dlp`` issues, so cancelled or expired work stops early.
+        """
+        canonical = canonicalize_url(url)
         options = self._options.copy()
         cookie_path: str | None = None
 
+        if deadline is not None:
+            deadline.check()
+            _apply_deadline(options, deadline)
+
         if cookies:
             # When cookies are passed dynamically, create a temporary file.
             # This is the primary method for Vercel.
@@ -40,8 +111,18 @@ class YtDlpExtractor:
             options.pop("cookiesfrombrowser", None)
 
         try:
-            with YoutubeDL(options) as ydl:
-                return ydl.extract_info(url, download=False, process=False)
+            with _youtube_dl_class()(options) as ydl:
+                if deadline is not None and hasattr(ydl, "urlopen"):
+                    ydl.urlopen = _guard_urlopen(ydl.urlopen, deadline)
+                info = ydl.extract_info(
+                    canonical.url,
+                    download=False,
+                    ie_key=canonical.extractor_key,
+                    process=False,
+                )
+            return prune_payload(info)
+        except DeadlineExceeded:
+            raise
         except Exception as exc:
             # --- НАЧАЛО ИЗМЕНЕНИЙ ---
             # Если возникает любая ошибка, добавляем к ней отладочную информацию
@@ -55,6 +136,59 @@ class YtDlpExtractor:
                     Path(cookie_path).unlink()
 
 
+def __getattr__(name: str) -> Any:
+    # ``yt_dlp`` takes a noticeable share of a second to import, so it is only
+    # loaded once ``YoutubeDL`` is actually needed.
+    if name == "YoutubeDL":
+        from yt_dlp import YoutubeDL
+
+        globals()["YoutubeDL"] = YoutubeDL
+        return YoutubeDL
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _youtube_dl_class() -> Any:
+    return globals().get("YoutubeDL") or __getattr__("YoutubeDL")
+
+
+def prune_payload(info: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a raw ``extract_info`` result to :data:`PAYLOAD_KEYS`.
+
+    Formats are trimmed to :data:`FORMAT_KEYS`. The returned dictionary shares
+    no containers with *info*, so the original can be garbage collected.
+    """
+
+    pruned = {key: value for key, value in info.items() if key in PAYLOAD_KEYS}
+    formats = info.get("formats")
+    if formats is not None:
+        pruned["formats"] = [
+            {key: value for key, value in fmt.items() if key in FORMAT_KEYS}
+            for fmt in formats
+            if isinstance(fmt, dict)
+        ]
+    return pruned
+
+
+def _apply_deadline(options: Dict[str, Any], deadline: Deadline) -> None:
+    remaining = deadline.remaining()
+    timeout = max(1.0, min(options.get("socket_timeout", DEFAULT_SOCKET_TIMEOUT), remaining))
+    # Only keep as many retries as there are full attempts left in the budget.
+    spare_attempts = max(0, int(remaining // timeout) - 1)
+    options["socket_timeout"] = timeout
+    options["retries"] = min(options.get("retries", DEFAULT_RETRIES), spare_attempts)
+    options["extractor_retries"] = min(
+        options.get("extractor_retries", DEFAULT_EXTRACTOR_RETRIES), spare_attempts
+    )
+
+
+def _guard_urlopen(urlopen: Callable[[Any], Any], deadline: Deadline) -> Callable[[Any], Any]:
+    def guarded(req: Any) -> Any:
+        deadline.check()
+        return urlopen(req)
+
+    return guarded
+
+
 def _build_default_options() -> Dict[str, Any]:
     """Builds the base dictionary of options for yt-dlp."""
 
@@ -76,6 +210,9 @@ def _build_default_options() -> Dict[str, Any]:
             "chapter": "-",
         },
         "extractor_args": extractor_args,
+        "socket_timeout": DEFAULT_SOCKET_TIMEOUT,
+        "retries": DEFAULT_RETRIES,
+        "extractor_retries": DEFAULT_EXTRACTOR_RETRIES,
     }
 
     # Note: Environment-based cookie handling is removed from here
@@ -0,0 +1,320 @@
+"""Resident lookup daemon for the command-line interface.
+
+Importing ``yt-dlp``, loading its extractors and warming the result cache
+costs more than many lookups do. The daemon pays that once and answers
+lookups from :func:`downloader.cli.main` over a Unix domain socket::
+
+    python -m downloader.daemon --detach
+    python -m downloader <url>            # served by the daemon
+    python -m downloader.daemon --stop
+
+The daemon exits on its own after ``--idle-timeout`` seconds without
+requests. The wire protocol is one JSON object per line in each direction.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from .core import MediaResult
+from .core.replay import build_extractor
+from .services import MediaService
+
+#: Seconds without requests after which the daemon shuts down.
+DEFAULT_IDLE_TIMEOUT = 15 * 60
+#: Environment variable overriding the socket location.
+SOCKET_ENV = "DOWNLOADER_SOCKET"
+#: Seconds allowed for connecting to the daemon.
+CONNECT_TIMEOUT = 1.0
+#: Seconds a lookup may take before the CLI gives up on the daemon.
+LOOKUP_TIMEOUT = 60.0
+
+
+class DaemonUnavailable(ConnectionError):
+    """Raised when no daemon is listening on the socket."""
+
+
+class DaemonError(RuntimeError):
+    """Raised when the daemon answered with an error."""
+
+
+def default_socket_path() -> Path:
+    """Socket location: ``$DOWNLOADER_SOCKET``, the runtime dir, or the temp dir."""
+
+    configured = os.environ.get(SOCKET_ENV)
+    if configured:
+        return Path(configured)
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return Path(runtime_dir) / "downloader.sock"
+    return Path(tempfile.gettempdir()) / f"downloader-{os.getuid()}.sock"
+
+
+# ----------------------------------------------------------------------
+# Client
+# ----------------------------------------------------------------------
+def call(message: Dict[str, Any], *, socket_path: str | os.PathLike[str] | None = None, timeout: float | None = None) -> Dict[str, Any]:
+    """Send *message* to the daemon and return its reply.
+
+    Only sockets owned by (and served by a process of) the current user are
+    trusted: the default location may be in a world-writable directory.
+    """
+
+    path = str(socket_path or default_socket_path())
+    try:
+        info = os.stat(path)
+    except FileNotFoundError as exc:
+        raise DaemonUnavailable(f"No daemon socket at {path}") from exc
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        raise DaemonUnavailable(f"{path} is not a socket owned by the current user")
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(CONNECT_TIMEOUT if timeout is None else min(timeout, CONNECT_TIMEOUT))
+            client.connect(path)
+            if _peer_uid(client) not in (None, os.getuid()):
+                raise DaemonUnavailable(f"Daemon on {path} runs as another user")
+            client.settimeout(timeout)
+            client.sendall(json.dumps(message).encode("utf-8") + b"\n")
+            with client.makefile("rb") as stream:
+                line = stream.readline()
+    except DaemonUnavailable:
+        raise
+    except OSError as exc:
+        # Refused, timed out, or the daemon died mid-request (reset, broken pipe).
+        raise DaemonUnavailable(str(exc) or "Daemon did not answer in time") from exc
+    if not line:
+        raise DaemonUnavailable("Daemon closed the connection without answering")
+    try:
+        reply = json.loads(line)
+    except ValueError as exc:
+        raise DaemonUnavailable(f"Garbled reply from daemon: {exc}") from exc
+    if not isinstance(reply, dict):
+        raise DaemonUnavailable("Garbled reply from daemon")
+    if not reply.get("ok"):
+        raise DaemonError(reply.get("error") or "Daemon request failed")
+    return reply
+
+
+def lookup(
+    url: str,
+    cookies: str | None = None,
+    *,
+    socket_path: str | os.PathLike[str] | None = None,
+    timeout: float = LOOKUP_TIMEOUT,
+) -> MediaResult:
+    """Resolve *url* through a running daemon.
+
+    Raises :class:`DaemonUnavailable` whenever the daemon cannot serve the
+    lookup: nothing listening, no answer within *timeout* seconds, the
+    connection dropped, or a garbled reply.
+    """
+
+    reply = call({"command": "lookup", "url": url, "cookies": cookies}, socket_path=socket_path, timeout=timeout)
+    try:
+        return MediaResult.from_dict(reply["result"])
+    except (KeyError, TypeError, ValueError) as exc:
+        raise DaemonUnavailable(f"Garbled reply from daemon: {exc!r}") from exc
+
+
+def _peer_uid(client: socket.socket) -> int | None:
+    """UID of the process serving *client*, where the platform reports it."""
+
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    credentials = client.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    _, uid, _ = struct.unpack("3i", credentials)
+    return uid
+
+
+# ----------------------------------------------------------------------
+# Server
+# ----------------------------------------------------------------------
+class _Handler(socketserver.StreamRequestHandler):
+    server: "DaemonServer"
+
+    def handle(self) -> None:
+        self.server.touch(+1)
+        try:
+            line = self.rfile.readline()
+            if not line:
+                return
+            try:
+                reply = self.server.dispatch(json.loads(line))
+            except Exception as exc:
+                reply = {"ok": False, "error": str(exc)}
+            self.wfile.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+        finally:
+            self.server.touch(-1)
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server answering lookups from a warm :class:`MediaService`."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str | os.PathLike[str], service: MediaService, *, idle_timeout: float) -> None:
+        self.socket_path = Path(socket_path)
+        _claim_socket(self.socket_path)
+        super().__init__(str(self.socket_path), _Handler)
+        os.chmod(self.socket_path, 0o600)
+        self.service = service
+        self.idle_timeout = idle_timeout
+        self.started_at = time.monotonic()
+        self.requests = 0
+        self._active = 0
+        self._last_activity = time.monotonic()
+        self._lock = threading.Lock()
+
+    def touch(self, delta: int) -> None:
+        with self._lock:
+            self._active += delta
+            self._last_activity = time.monotonic()
+            if delta > 0:
+                self.requests += 1
+
+    def idle_for(self) -> float:
+        with self._lock:
+            if self._active:
+                return 0.0
+            return time.monotonic() - self._last_activity
+
+    def dispatch(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        command = message.get("command", "lookup")
+        if command == "lookup":
+            result = self.service.get_media(message["url"], message.get("cookies"))
+            return {"ok": True, "result": result.to_dict()}
+        if command == "status":
+            return {
+                "ok": True,
+                "pid": os.getpid(),
+                "uptime_s": round(time.monotonic() - self.started_at, 3),
+                "requests": self.requests,
+                "idle_timeout_s": self.idle_timeout,
+                "cached": len(self.service.cache),
+            }
+        if command == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"ok": True}
+        raise ValueError(f"Unknown command: {command}")
+
+    def serve_until_idle(self) -> None:
+        """Serve requests until shut down or idle for :attr:`idle_timeout` seconds."""
+
+        def watchdog() -> None:
+            while not stopped.wait(min(1.0, self.idle_timeout / 4)):
+                if self.idle_for() >= self.idle_timeout:
+                    self.shutdown()
+                    return
+
+        stopped = threading.Event()
+        if self.idle_timeout > 0:
+            threading.Thread(target=watchdog, name="daemon-idle-watchdog", daemon=True).start()
+        try:
+            self.serve_forever(poll_interval=0.2)
+        finally:
+            stopped.set()
+            self.server_close()
+            self.socket_path.unlink(missing_ok=True)
+            self.service.close()
+
+
+def _claim_socket(path: Path) -> None:
+    """Remove a stale socket file, refusing to replace a live daemon."""
+
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return
+    try:
+        call({"command": "status"}, socket_path=path, timeout=1.0)
+    except (DaemonUnavailable, OSError, ValueError):
+        path.unlink(missing_ok=True)
+        return
+    raise RuntimeError(f"A daemon is already listening on {path}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Keep a warm media lookup service for the CLI.")
+    parser.add_argument("--socket", help="Unix socket path (default: %(default)s).", default=str(default_socket_path()))
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        help="Exit after this many seconds without requests; 0 keeps running.",
+    )
+    parser.add_argument("--extractor", choices=("live", "record", "replay"), default="live")
+    parser.add_argument("--corpus", metavar="DIR", help="Payload corpus for --extractor record/replay.")
+    parser.add_argument("--detach", action="store_true", help="Start the daemon in the background and return.")
+    parser.add_argument("--status", action="store_true", help="Print the status of the running daemon.")
+    parser.add_argument("--stop", action="store_true", help="Ask the running daemon to exit.")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.status or args.stop:
+        try:
+            command = "shutdown" if args.stop else "status"
+            reply = call({"command": command}, socket_path=args.socket, timeout=5.0)
+        except DaemonUnavailable:
+            print("No daemon is running.", file=sys.stderr)
+            return 1
+        print(json.dumps(reply, indent=2))
+        return 0
+
+    if args.extractor != "live" and not args.corpus:
+        parser.error("--corpus is required with --extractor record/replay")
+
+    if args.detach:
+        return _detach(args)
+
+    extractor = build_extractor(args.extractor, args.corpus)
+    preload = getattr(extractor, "preload", None)
+    if preload is not None:
+        preload()
+    server = DaemonServer(args.socket, MediaService(extractor), idle_timeout=args.idle_timeout)
+    server.serve_until_idle()
+    return 0
+
+
+def _detach(args: argparse.Namespace) -> int:
+    command = [sys.executable, "-m", "downloader.daemon", "--socket", args.socket, "--idle-timeout", str(args.idle_timeout)]
+    command += ["--extractor", args.extractor]
+    if args.corpus:
+        command += ["--corpus", args.corpus]
+    subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            call({"command": "status"}, socket_path=args.socket, timeout=1.0)
+        except (DaemonUnavailable, OSError):
+            time.sleep(0.05)
+            continue
+        print(f"Daemon listening on {args.socket}", file=sys.stderr)
+        return 0
+    print("Daemon did not start in time.", file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
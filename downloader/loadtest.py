@@ -0,0 +1,513 @@
+"""Open-loop load generator for the web application.
+
+Drives ``/api/streams`` of :func:`downloader.web.create_app` either in-process
+through the ASGI interface or over local HTTP, backed by a synthetic
+extractor so that the numbers reflect the service rather than YouTube::
+
+    python -m downloader.loadtest --rate 200 --duration 10 --hit-ratio 0.9
+
+or by a recorded corpus (``--extractor replay --corpus DIR``), in which case
+the URLs are drawn from the corpus.
+
+Requests are issued on an arrival schedule that does not wait for earlier
+responses, so queueing delay shows up in the reported latency instead of
+silently lowering the offered load. Results are printed as JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import string
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from .core import Deadline, PayloadStore, ReplayExtractor
+from .services import MediaService
+from .services.media import MediaExtractor
+
+_ID_ALPHABET = string.ascii_letters + string.digits + "-_"
+
+
+class FakeExtractor:
+    """Extractor returning synthetic YouTube-shaped payloads after a delay.
+
+    The delay blocks the calling thread, as a real ``yt-dlp`` extraction does,
+    but honours a :class:`~downloader.core.Deadline` like the live extractor.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.25,
+        jitter: float = 0.1,
+        formats: int = 30,
+        ttl: int = 6 * 60 * 60,
+        seed: int | None = None,
+    ) -> None:
+        self._latency = latency
+        self._jitter = jitter
+        self._formats = formats
+        self._ttl = ttl
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def extract(
+        self,
+        url: str,
+        cookies: str | None = None,
+        deadline: Deadline | None = None,
+    ) -> Dict[str, Any]:
+        with self._lock:
+            delay = max(0.0, self._random.gauss(self._latency, self._jitter))
+        finish = time.monotonic() + delay
+        while True:
+            if deadline is not None:
+                deadline.check()
+            left = finish - time.monotonic()
+            if left <= 0:
+                break
+            # Sleep in slices, mimicking the per-request checks of the live extractor.
+            time.sleep(min(left, 0.05))
+        expire = int(time.time()) + self._ttl
+        formats = []
+        for index in range(self._formats):
+            video = index % 3 != 0
+            formats.append(
+                {
+                    "format_id": str(100 + index),
+                    "url": f"https://rr1.googlevideo.com/videoplayback?expire={expire}&itag={100 + index}&id={abs(hash(url))}",
+                    "ext": "mp4" if video else "m4a",
+                    "vcodec": "avc1.4d401f" if video else "none",
+                    "acodec": "none" if video else "mp4a.40.2",
+                    "width": 1280 if video else None,
+                    "height": 720 if video else None,
+                    "fps": 30 if video else None,
+                    "tbr": 1200.0 + index,
+                    "filesize": 5_000_000 + index,
+                }
+            )
+        return {"id": url, "title": f"Load test {url}", "webpage_url": url, "formats": formats}
+
+
+def build_extractor(kind: str, args: argparse.Namespace) -> MediaExtractor:
+    """Instantiate the extractor selected on the command line."""
+
+    if kind == "fake":
+        return FakeExtractor(latency=args.latency, jitter=args.jitter, formats=args.formats, seed=args.seed)
+    if kind == "replay":
+        # Shifted expiries keep an old corpus cacheable like live results.
+        return ReplayExtractor(PayloadStore(args.corpus), shift_expiry=True)
+    raise ValueError(f"Unsupported extractor: {kind}")
+
+
+# ----------------------------------------------------------------------
+# Workload
+# ----------------------------------------------------------------------
+@dataclass(slots=True)
+class Sample:
+    """Outcome of a single request."""
+
+    kind: str
+    status: int
+    latency: float
+
+
+@dataclass(slots=True)
+class Workload:
+    """Arrival schedule and URL mix for a run."""
+
+    rate: float
+    duration: float
+    hit_ratio: float
+    hot_set: int
+    arrival: str = "poisson"
+    seed: int | None = None
+    #: Draw URLs from this list instead of generating them. Hot URLs come
+    #: first; "miss" URLs cycle through the rest, so they repeat once the
+    #: pool is exhausted.
+    url_pool: List[str] | None = None
+    _random: random.Random = field(init=False, repr=False)
+    _hot_urls: List[str] = field(init=False, repr=False)
+    _pool_index: int = field(init=False, repr=False, default=0)
+
+    def __post_init__(self) -> None:
+        self._random = random.Random(self.seed)
+        if self.url_pool:
+            self._pool_index = max(1, min(self.hot_set, len(self.url_pool) - 1))
+            self._hot_urls = list(self.url_pool[: self._pool_index])
+        else:
+            self._hot_urls = [self._new_url() for _ in range(max(1, self.hot_set))]
+
+    @property
+    def hot_urls(self) -> List[str]:
+        return list(self._hot_urls)
+
+    def schedule(self) -> List[Tuple[float, str, str]]:
+        """Return ``(offset, kind, url)`` tuples sorted by arrival offset."""
+
+        arrivals: List[Tuple[float, str, str]] = []
+        offset = 0.0
+        count = 0
+        while True:
+            count += 1
+            if self.arrival == "poisson":
+                offset += self._random.expovariate(self.rate)
+            else:
+                offset = count / self.rate
+            if offset >= self.duration:
+                return arrivals
+            if self._random.random() < self.hit_ratio:
+                arrivals.append((offset, "hit", self._random.choice(self._hot_urls)))
+            else:
+                arrivals.append((offset, "miss", self._new_url()))
+
+    def _new_url(self) -> str:
+        if self.url_pool:
+            hot = len(self._hot_urls)
+            cold = len(self.url_pool) - hot
+            if cold <= 0:
+                return self._random.choice(self._hot_urls)
+            url = self.url_pool[hot + (self._pool_index - hot) % cold]
+            self._pool_index += 1
+            return url
+        media_id = "".join(self._random.choice(_ID_ALPHABET) for _ in range(11))
+        return f"https://www.youtube.com/watch?v={media_id}"
+
+
+# ----------------------------------------------------------------------
+# Transports
+# ----------------------------------------------------------------------
+Requester = Callable[[str], Awaitable[int]]
+
+
+class ASGIClient:
+    """Minimal in-process client calling an ASGI application directly."""
+
+    def __init__(self, app: Any, *, method: str = "GET", headers: Dict[str, str] | None = None) -> None:
+        self._app = app
+        self._method = method
+        self._headers = [(key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in (headers or {}).items()]
+        self._lifespan: Optional[asyncio.Task[None]] = None
+        self._lifespan_queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        self._lifespan_events: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+    async def start(self) -> None:
+        """Run the application's lifespan startup, if it implements one."""
+
+        async def receive() -> Dict[str, Any]:
+            return await self._lifespan_queue.get()
+
+        async def send(message: Dict[str, Any]) -> None:
+            await self._lifespan_events.put(message)
+
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+        self._lifespan = asyncio.create_task(self._app(scope, receive, send))
+        await self._lifespan_queue.put({"type": "lifespan.startup"})
+        event = await self._lifespan_events.get()
+        if event["type"] == "lifespan.startup.failed":
+            raise RuntimeError(event.get("message") or "Application startup failed")
+
+    async def stop(self) -> None:
+        if self._lifespan is None:
+            return
+        await self._lifespan_queue.put({"type": "lifespan.shutdown"})
+        await self._lifespan_events.get()
+        await self._lifespan
+
+    async def request(self, url: str) -> int:
+        body = b""
+        query = b""
+        headers = [(b"host", b"loadtest"), *self._headers]
+        if self._method == "GET":
+            query = urlencode({"url": url}).encode("ascii")
+        else:
+            body = json.dumps({"url": url}).encode("utf-8")
+            headers.append((b"content-type", b"application/json"))
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": self._method,
+            "scheme": "http",
+            "path": "/api/streams",
+            "raw_path": b"/api/streams",
+            "query_string": query,
+            "root_path": "",
+            "headers": headers,
+            "client": ("127.0.0.1", 0),
+            "server": ("loadtest", 80),
+        }
+        done = asyncio.Event()
+        status = 0
+        sent = False
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Keep the connection "open" until the response is complete.
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body"):
+                done.set()
+
+        try:
+            await self._app(scope, receive, send)
+        finally:
+            done.set()
+        return status
+
+
+class HTTPClient:
+    """HTTP/1.1 client opening one connection per request."""
+
+    def __init__(self, base_url: str, *, method: str = "GET", headers: Dict[str, str] | None = None) -> None:
+        parts = urlsplit(base_url)
+        self._host = parts.hostname or "127.0.0.1"
+        self._port = parts.port or 80
+        self._method = method
+        self._extra_headers = "".join(f"{key}: {value}\r\n" for key, value in (headers or {}).items())
+
+    async def request(self, url: str) -> int:
+        reader, writer = await asyncio.open_connection(self._host, self._port)
+        try:
+            if self._method == "GET":
+                target = "/api/streams?" + urlencode({"url": url})
+                body = b""
+            else:
+                target = "/api/streams"
+                body = json.dumps({"url": url}).encode("utf-8")
+            head = (
+                f"{self._method} {target} HTTP/1.1\r\n"
+                f"Host: {self._host}:{self._port}\r\n"
+                "Accept-Encoding: gzip\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"{self._extra_headers}"
+                "Connection: close\r\n\r\n"
+            )
+            writer.write(head.encode("ascii") + body)
+            await writer.drain()
+            status_line = await reader.readline()
+            await reader.read()
+            return int(status_line.split()[1])
+        finally:
+            writer.close()
+
+
+class LocalServer:
+    """Serve an ASGI app with ``uvicorn`` on a free localhost port."""
+
+    def __init__(self, app: Any) -> None:
+        import uvicorn
+
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            self.port = probe.getsockname()[1]
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", access_log=False)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "LocalServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._server.should_exit = True
+        self._thread.join()
+
+
+# ----------------------------------------------------------------------
+# Runner and report
+# ----------------------------------------------------------------------
+async def run_workload(requester: Requester, workload: Workload, *, warmup: bool = True) -> Dict[str, Any]:
+    """Fire requests following *workload*'s schedule and summarise them."""
+
+    if warmup:
+        await asyncio.gather(*(requester(url) for url in workload.hot_urls))
+
+    samples: List[Sample] = []
+
+    async def fire(kind: str, url: str) -> None:
+        started = time.perf_counter()
+        try:
+            status = await requester(url)
+        except Exception:  # pragma: no cover - counted as transport failure
+            status = 0
+        samples.append(Sample(kind=kind, status=status, latency=time.perf_counter() - started))
+
+    tasks: List[asyncio.Task[None]] = []
+    begin = time.perf_counter()
+    for offset, kind, url in workload.schedule():
+        delay = begin + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(fire(kind, url)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - begin
+    return summarise(samples, elapsed=elapsed, workload=workload)
+
+
+def summarise(samples: List[Sample], *, elapsed: float, workload: Workload) -> Dict[str, Any]:
+    ok = [sample for sample in samples if 200 <= sample.status < 400]
+    statuses: Dict[str, int] = {}
+    for sample in samples:
+        statuses[str(sample.status)] = statuses.get(str(sample.status), 0) + 1
+    return {
+        "offered_rps": workload.rate,
+        "duration_s": round(elapsed, 3),
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "status_counts": statuses,
+        "latency_ms": _latency_summary([sample.latency for sample in ok]),
+        "by_kind": {
+            kind: _latency_summary([sample.latency for sample in ok if sample.kind == kind])
+            for kind in ("hit", "miss")
+        },
+    }
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of *values* (``q`` in ``[0, 100]``)."""
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def _latency_summary(latencies: List[float]) -> Dict[str, float]:
+    if not latencies:
+        return {"count": 0}
+    return {
+        "count": len(latencies),
+        "mean": round(1000 * sum(latencies) / len(latencies), 2),
+        "p50": round(1000 * percentile(latencies, 50), 2),
+        "p95": round(1000 * percentile(latencies, 95), 2),
+        "p99": round(1000 * percentile(latencies, 99), 2),
+        "max": round(1000 * max(latencies), 2),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Load-test the /api/streams endpoint.")
+    parser.add_argument("--rate", type=float, default=50.0, help="Offered load in requests per second.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Length of the run in seconds.")
+    parser.add_argument(
+        "--arrival",
+        choices=("poisson", "uniform"),
+        default="poisson",
+        help="Inter-arrival distribution of the open-loop schedule.",
+    )
+    parser.add_argument(
+        "--hit-ratio",
+        type=float,
+        default=0.8,
+        help="Share of requests drawn from the hot URL set; the rest use unique URLs.",
+    )
+    parser.add_argument("--hot-set", type=int, default=20, help="Number of distinct hot URLs.")
+    parser.add_argument("--no-warmup", action="store_true", help="Do not prime the hot URLs before measuring.")
+    parser.add_argument("--method", choices=("GET", "POST"), default="GET")
+    parser.add_argument(
+        "--header",
+        action="append",
+        default=[],
+        metavar="NAME:VALUE",
+        help="Extra request header; may be repeated.",
+    )
+    parser.add_argument(
+        "--transport",
+        choices=("asgi", "http"),
+        default="asgi",
+        help="Call the app in-process or through a local uvicorn server.",
+    )
+    parser.add_argument("--target", help="Base URL of an already running server (implies --transport http).")
+    parser.add_argument("--extractor", choices=("fake", "replay"), default="fake")
+    parser.add_argument("--corpus", metavar="DIR", help="Recorded payload corpus for --extractor replay.")
+    parser.add_argument("--latency", type=float, default=0.25, help="Mean fake extraction latency in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Standard deviation of the fake latency.")
+    parser.add_argument("--formats", type=int, default=30, help="Formats per fake payload.")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.rate <= 0 or args.duration <= 0:
+        parser.error("--rate and --duration must be positive")
+    url_pool = None
+    if args.extractor == "replay":
+        if not args.corpus:
+            parser.error("--extractor replay requires --corpus")
+        url_pool = PayloadStore(args.corpus).urls()
+        if not url_pool:
+            parser.error(f"Corpus {args.corpus} is empty")
+
+    workload = Workload(
+        rate=args.rate,
+        duration=args.duration,
+        hit_ratio=args.hit_ratio,
+        hot_set=args.hot_set,
+        arrival=args.arrival,
+        seed=args.seed,
+        url_pool=url_pool,
+    )
+    warmup = not args.no_warmup
+    headers = {}
+    for item in args.header:
+        name, separator, value = item.partition(":")
+        if not separator or not name.strip():
+            parser.error(f"Invalid header: {item!r}")
+        headers[name.strip()] = value.strip()
+
+    if args.target:
+        client = HTTPClient(args.target, method=args.method, headers=headers)
+        report = asyncio.run(run_workload(client.request, workload, warmup=warmup))
+    else:
+        from .web.app import create_app
+
+        app = create_app(MediaService(build_extractor(args.extractor, args)))
+        if args.transport == "http":
+            with LocalServer(app) as server:
+                client = HTTPClient(server.base_url, method=args.method, headers=headers)
+                report = asyncio.run(run_workload(client.request, workload, warmup=warmup))
+        else:
+            report = asyncio.run(_run_in_process(ASGIClient(app, method=args.method, headers=headers), workload, warmup=warmup))
+
+    report["transport"] = "http" if args.target or args.transport == "http" else "asgi"
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+async def _run_in_process(client: ASGIClient, workload: Workload, *, warmup: bool) -> Dict[str, Any]:
+    await client.start()
+    try:
+        return await run_workload(client.request, workload, warmup=warmup)
+    finally:
+        await client.stop()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
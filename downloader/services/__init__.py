@@ -1,5 +1,7 @@
 """Business services orchestrating metadata extraction."""
 
+from .cache import ResultCache
 from .media import MediaService
+from .refresh import RefreshPolicy
 
-__all__ = ["MediaService"]
+__all__ = ["MediaService", "RefreshPolicy", "ResultCache"]
@@ -0,0 +1,115 @@
+"""In-memory cache of extraction results."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from ..core import MediaResult
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """A cached result together with its freshness bounds and popularity."""
+
+    result: MediaResult
+    #: URL the result was extracted from, used to refresh it.
+    url: str
+    #: Unix time until which the result is served without revalidation.
+    fresh_until: float
+    #: Unix time after which the result is dropped; in between it is stale.
+    stale_until: float
+    #: Number of lookups served by this entry (and, decayed, its predecessors).
+    hits: int = 0
+    #: Unix time the entry was stored.
+    stored_at: float = 0.0
+
+
+class ResultCache:
+    """Thread-safe LRU cache whose entries expire at an absolute timestamp."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, *, now: float | None = None) -> Optional[MediaResult]:
+        """Return the cached result for *key* unless it is missing or no longer fresh."""
+
+        current = time.time() if now is None else now
+        entry = self.lookup(key, now=current)
+        if entry is None or entry.fresh_until <= current:
+            return None
+        return entry.result
+
+    def lookup(self, key: str, *, now: float | None = None) -> Optional[CacheEntry]:
+        """Return the entry for *key*, fresh or stale, and record the access.
+
+        Entries past :attr:`CacheEntry.stale_until` are evicted and reported
+        as a miss.
+        """
+
+        current = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.stale_until <= current:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            self.hits += 1
+            return entry
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for *key* without touching statistics or LRU order."""
+
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(
+        self,
+        key: str,
+        result: MediaResult,
+        expires_at: float,
+        *,
+        url: str = "",
+        stale_until: float | None = None,
+        hits: int = 0,
+    ) -> CacheEntry:
+        """Store *result* under *key*, fresh until *expires_at* (Unix time).
+
+        Without *stale_until* the entry is dropped as soon as it stops being
+        fresh.
+        """
+
+        entry = CacheEntry(
+            result=result,
+            url=url,
+            fresh_until=expires_at,
+            stale_until=expires_at if stale_until is None else max(stale_until, expires_at),
+            hits=hits,
+            stored_at=time.time(),
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def items(self) -> List[Tuple[str, CacheEntry]]:
+        """Snapshot of the cached ``(key, entry)`` pairs, least recent first."""
+
+        with self._lock:
+            return list(self._entries.items())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
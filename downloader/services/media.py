@@ -2,28 +2,177 @@
 
 from __future__ import annotations
 
+import inspect
+import time
+from concurrent.futures import Future, wait
 from typing import Any, Dict, Iterable, Protocol
 
-from ..core import MediaResult, MediaStream, YtDlpExtractor
+from ..core import Deadline, MediaResult, MediaStream, YtDlpExtractor
+from ..core.urls import canonicalize_url
+from .cache import CacheEntry, ResultCache
+from .refresh import BackgroundRefresher, RefreshPolicy
+
+#: Cache lifetime for results whose stream URLs carry no expiry.
+DEFAULT_CACHE_TTL = 300
+#: Stop treating cached results as fresh this many seconds before their
+#: stream URLs expire.
+CACHE_EXPIRY_MARGIN = 300
+#: Serve stale results (while a refresh runs) until this many seconds before
+#: the stream URLs expire, or this long past the TTL when they carry no expiry.
+STALE_GRACE = 60
 
 
 class MediaExtractor(Protocol):
-    """Protocol describing extractor implementations."""
+    """Protocol describing extractor implementations.
+
+    Accepting *deadline* is optional: extractors whose ``extract`` has no
+    such parameter are called without it and simply run to completion.
+    """
 
-    def extract(self, url: str, cookies: str | None = None) -> Dict[str, Any]:
+    def extract(
+        self,
+        url: str,
+        cookies: str | None = None,
+        deadline: Deadline | None = None,
+    ) -> Dict[str, Any]:
         ...
 
 
 class MediaService:
     """Facade that transforms raw ``yt-dlp`` data into structured objects."""
 
-    def __init__(self, extractor: MediaExtractor | None = None) -> None:
+    def __init__(
+        self,
+        extractor: MediaExtractor | None = None,
+        cache: ResultCache | None = None,
+        refresh_policy: RefreshPolicy | None = None,
+    ) -> None:
         self._extractor: MediaExtractor = extractor or YtDlpExtractor()
+        self._accepts_deadline = _accepts_keyword(self._extractor.extract, "deadline")
+        self._cache = cache if cache is not None else ResultCache()
+        self._policy = refresh_policy or RefreshPolicy()
+        self._refresher = BackgroundRefresher(self._policy)
+
+    @property
+    def cache(self) -> ResultCache:
+        return self._cache
+
+    def get_media(
+        self,
+        url: str,
+        cookies: str | None = None,
+        deadline: Deadline | None = None,
+    ) -> MediaResult:
+        """Retrieve structured metadata for *url*.
+
+        Anonymous lookups are cached under the canonical identity of *url*, so
+        ``youtu.be/ID`` and ``youtube.com/watch?v=ID&t=30s`` share one entry.
+        Lookups with cookies may be personalised and always hit the extractor.
+
+        Stale entries are still served while a background refresh replaces
+        them, and popular ("hot") entries are refreshed shortly before they
+        go stale, so repeat lookups rarely wait for an extraction.
+
+        A *deadline* is forwarded to the extractor; if it has already expired
+        or been cancelled by the time a cache miss is handled,
+        :class:`~downloader.core.DeadlineExceeded` is raised without starting
+        the extraction.
+        """
+
+        if not cookies:
+            cached = self.get_cached(url)
+            if cached is not None:
+                return cached
+        return self.fetch(url, cookies, deadline)
+
+    def fetch(
+        self,
+        url: str,
+        cookies: str | None = None,
+        deadline: Deadline | None = None,
+    ) -> MediaResult:
+        """Extract *url* without consulting the cache, caching anonymous results.
+
+        For callers that already checked :meth:`get_cached`.
+        """
+
+        result = self._extract(url, cookies, deadline)
+        if not cookies:
+            self._store(canonicalize_url(url).cache_key, url, result, hits=1)
+        return result
+
+    def get_cached(self, url: str) -> MediaResult | None:
+        """Return the cached result for an anonymous lookup of *url*, if any.
+
+        Never blocks on an extraction, so callers can answer cache hits
+        without queueing for a worker; a due refresh is still scheduled.
+        """
+
+        key = canonicalize_url(url).cache_key
+        now = time.time()
+        entry = self._cache.lookup(key, now=now)
+        if entry is None:
+            return None
+        if self._needs_refresh(entry, now):
+            self._schedule_refresh(key, entry.url)
+        return entry.result
+
+    def warm_up(self, urls: Iterable[str], *, wait_for: bool = False) -> int:
+        """Populate the cache for *urls* in the background.
+
+        Warmed entries start out hot, so they are kept fresh from then on.
+        Every URL is queued, however long the list; at most
+        :attr:`RefreshPolicy.max_concurrency` are extracted at a time. With
+        *wait_for* the call blocks until every scheduled extraction has
+        finished. Returns the number of extractions scheduled.
+        """
+
+        futures: Dict[str, Future[None]] = {}
+        for url in urls:
+            key = canonicalize_url(url).cache_key
+            future = self._schedule_refresh(key, url, min_hits=self._policy.hot_threshold, drop_when_full=False)
+            if future is not None:
+                futures[key] = future
+        if wait_for and futures:
+            wait(futures.values())
+        return len(futures)
 
-    def get_media(self, url: str, cookies: str | None = None) -> MediaResult:
-        """Retrieve structured metadata for *url*."""
+    def refresh_due(self, *, now: float | None = None) -> int:
+        """Schedule refreshes for every hot entry nearing staleness.
 
-        payload = self._extractor.extract(url, cookies=cookies)
+        Cold entries are left alone: once stale they are revalidated only if
+        somebody asks for them again, otherwise they simply expire.
+        """
+
+        current = time.time() if now is None else now
+        scheduled = 0
+        for key, entry in self._cache.items():
+            if entry.hits < self._policy.hot_threshold:
+                continue
+            if self._needs_refresh(entry, current) and self._schedule_refresh(key, entry.url):
+                scheduled += 1
+        return scheduled
+
+    def start_background_refresh(self, interval: float = 30.0) -> None:
+        """Run :meth:`refresh_due` every *interval* seconds on a daemon thread."""
+
+        self._refresher.start(interval, self.refresh_due)
+
+    def close(self) -> None:
+        """Stop background refreshing."""
+
+        self._refresher.close()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _extract(self, url: str, cookies: str | None, deadline: Deadline | None) -> MediaResult:
+        if deadline is not None:
+            deadline.check()
+        if deadline is not None and self._accepts_deadline:
+            payload = self._extractor.extract(url, cookies=cookies, deadline=deadline)
+        else:
+            payload = self._extractor.extract(url, cookies=cookies)
         formats = payload.get("formats") or []
 
         video_streams = list(self._build_streams(formats, kind="video"))
@@ -39,9 +188,45 @@ class MediaService:
             audio_streams=audio_streams,
         )
 
-    # ------------------------------------------------------------------
-    # Internal helpers
-    # ------------------------------------------------------------------
+    def _store(self, key: str, url: str, result: MediaResult, *, hits: int) -> CacheEntry:
+        expires_at = result.expires_at
+        if expires_at is None:
+            fresh_until = time.time() + DEFAULT_CACHE_TTL
+            stale_until = fresh_until + STALE_GRACE
+        else:
+            fresh_until = expires_at - CACHE_EXPIRY_MARGIN
+            stale_until = expires_at - STALE_GRACE
+        return self._cache.put(key, result, fresh_until, url=url, stale_until=stale_until, hits=hits)
+
+    def _needs_refresh(self, entry: CacheEntry, now: float) -> bool:
+        if now >= entry.fresh_until:
+            return True
+        if entry.hits < self._policy.hot_threshold:
+            return False
+        # Never refresh during the first half of an entry's lifetime, so short
+        # lived entries are not refreshed on every lookup.
+        lifetime = entry.fresh_until - entry.stored_at
+        ahead = min(self._policy.refresh_ahead, lifetime / 2)
+        return now >= entry.fresh_until - ahead
+
+    def _schedule_refresh(
+        self,
+        key: str,
+        url: str,
+        *,
+        min_hits: int = 0,
+        drop_when_full: bool = True,
+    ) -> Future[None] | None:
+        def refresh() -> None:
+            result = self._extract(url, None, Deadline(self._policy.timeout))
+            previous = self._cache.peek(key)
+            # Halve the popularity on every refresh so entries nobody asks
+            # for any more cool down and stop being refreshed.
+            hits = previous.hits // 2 if previous is not None else 0
+            self._store(key, url, result, hits=max(hits, min_hits))
+
+        return self._refresher.schedule(key, refresh, drop_when_full=drop_when_full)
+
     def _build_streams(self, formats: Iterable[Dict[str, Any]], *, kind: str) -> Iterable[MediaStream]:
         for fmt in formats:
             stream = self._convert_format(fmt, kind=kind)
@@ -133,3 +318,13 @@ class MediaService:
         if isinstance(size, (int, float)):
             return int(size)
         return None
+
+
+def _accepts_keyword(func: Any, name: str) -> bool:
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):  # pragma: no cover - builtins without signatures
+        return False
+    return any(
+        parameter.name == name or parameter.kind is inspect.Parameter.VAR_KEYWORD for parameter in parameters
+    )
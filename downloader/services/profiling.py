@@ -0,0 +1,140 @@
+"""On-demand sampling profiler for individual lookups.
+
+Profiles are written in the "folded stacks" format (one ``frame;frame;frame
+count`` line per distinct stack) understood by ``flamegraph.pl``, speedscope
+and most other flame graph viewers.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+class StackSampler:
+    """Periodically sample the call stack of one thread."""
+
+    def __init__(self, thread_id: int, *, interval: float = 0.005, root: CodeType | None = None) -> None:
+        self._thread_id = thread_id
+        self._interval = interval
+        self._root = root
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self.stacks: Counter[str] = Counter()
+
+    def __enter__(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self.stacks[self._fold(frame)] += 1
+
+    def _fold(self, frame: Optional[FrameType]) -> str:
+        names: List[str] = []
+        while frame is not None:
+            code = frame.f_code
+            if code is self._root:
+                break
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        names.reverse()
+        return ";".join(name.replace(";", ",") for name in names) or "<idle>"
+
+
+class ProfileStore:
+    """Directory holding at most *limit* profiles, oldest evicted first."""
+
+    def __init__(self, directory: str | os.PathLike[str], *, limit: int = 50) -> None:
+        self._directory = Path(directory)
+        self._limit = max(1, limit)
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    def save(self, label: str, stacks: Counter[str]) -> str:
+        """Write *stacks* to a new file and return its name."""
+
+        slug = _UNSAFE_CHARS.sub("_", label)[:60].strip("_") or "profile"
+        name = f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{slug}.folded"
+        lines = [f"{stack} {count}\n" for stack, count in stacks.most_common()]
+        with self._lock:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            (self._directory / name).write_text("".join(lines), encoding="utf-8")
+            self._evict()
+        return name
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Describe the stored profiles, newest first."""
+
+        entries = []
+        for path in self._files():
+            stat = path.stat()
+            entries.append({"name": path.name, "size_bytes": stat.st_size, "created_at": int(stat.st_mtime)})
+        entries.reverse()
+        return entries
+
+    def path_for(self, name: str) -> Path | None:
+        """Return the path of profile *name* if it exists in the store."""
+
+        if os.path.basename(name) != name:
+            return None
+        path = self._directory / name
+        return path if path.suffix == ".folded" and path.is_file() else None
+
+    def _files(self) -> List[Path]:
+        if not self._directory.is_dir():
+            return []
+        # Names start with a timestamp, so lexical order is creation order.
+        return sorted(self._directory.glob("*.folded"))
+
+    def _evict(self) -> None:
+        files = self._files()
+        for path in files[: max(0, len(files) - self._limit)]:
+            path.unlink(missing_ok=True)
+
+
+def profile_call(
+    store: ProfileStore,
+    label: str,
+    func: Callable[..., T],
+    *args: Any,
+    interval: float = 0.005,
+    on_saved: Callable[[str], None] | None = None,
+    **kwargs: Any,
+) -> T:
+    """Call ``func(*args, **kwargs)`` in this thread while sampling its stack.
+
+    The profile is saved under *label* even if *func* raises; *on_saved*
+    receives the file name. Calls too short to be sampled (cache hits, for
+    instance) leave no profile behind.
+    """
+
+    sampler = StackSampler(threading.get_ident(), interval=interval, root=profile_call.__code__)
+    try:
+        with sampler:
+            return func(*args, **kwargs)
+    finally:
+        if sampler.stacks:
+            name = store.save(label, sampler.stacks)
+            if on_saved is not None:
+                on_saved(name)
@@ -0,0 +1,125 @@
+"""Bounded background execution of cache refreshes."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class RefreshPolicy:
+    """When and how aggressively cached results are refreshed."""
+
+    #: Lookups an entry must have served to count as hot.
+    hot_threshold: int = 3
+    #: Hot entries are refreshed this many seconds before they stop being fresh.
+    refresh_ahead: float = 600.0
+    #: Refreshes running at the same time.
+    max_concurrency: int = 2
+    #: Refreshes running or queued; further requests are dropped.
+    max_pending: int = 32
+    #: Time budget (seconds) of a single refresh.
+    timeout: float = 60.0
+
+
+class BackgroundRefresher:
+    """Run at most one refresh per key on a small worker pool."""
+
+    def __init__(self, policy: RefreshPolicy) -> None:
+        self._policy = policy
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, Future[None]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def schedule(self, key: str, job: Callable[[], None], *, drop_when_full: bool = True) -> Optional[Future[None]]:
+        """Submit *job* unless *key* is already being refreshed or the queue is full.
+
+        With *drop_when_full* unset the job is queued even past
+        :attr:`RefreshPolicy.max_pending`; it still waits for one of the
+        :attr:`RefreshPolicy.max_concurrency` workers.
+        """
+
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            if drop_when_full and len(self._pending) >= self._policy.max_pending:
+                return None
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._policy.max_concurrency,
+                    thread_name_prefix="cache-refresh",
+                )
+            future = self._executor.submit(self._run, key, job)
+            self._pending[key] = future
+            return future
+
+    def start(self, interval: float, sweep: Callable[[], None]) -> None:
+        """Call *sweep* every *interval* seconds on a daemon thread."""
+
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            stop = self._stop
+
+        def loop() -> None:
+            while not stop.wait(interval):
+                try:
+                    sweep()
+                except Exception:  # pragma: no cover - keep the sweeper alive
+                    logger.exception("Cache refresh sweep failed")
+
+        sweeper = threading.Thread(target=loop, name="cache-refresh-sweeper", daemon=True)
+        with self._lock:
+            self._sweeper = sweeper
+        sweeper.start()
+
+    def close(self, wait: bool = False) -> None:
+        """Stop the sweeper and the worker pool; queued refreshes are dropped.
+
+        The refresher stays usable: a later :meth:`schedule` or :meth:`start`
+        brings up a fresh pool or sweeper.
+        """
+
+        with self._lock:
+            self._stop.set()
+            self._stop = threading.Event()
+            self._sweeper = None
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        with self._lock:
+            # Cancelled jobs never reach _run, which would otherwise clear them.
+            self._pending = {key: future for key, future in self._pending.items() if not future.cancelled()}
+
+    def _run(self, key: str, job: Callable[[], None]) -> None:
+        try:
+            job()
+        except Exception:
+            logger.warning("Background refresh of %s failed", key, exc_info=True)
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+
+def load_url_list(path: str | Path) -> List[str]:
+    """Read one URL per line from *path*, skipping blanks and ``#`` comments."""
+
+    urls = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        stripped = line.strip()
+        if stripped and not stripped.startswith("#"):
+            urls.append(stripped)
+    return urls
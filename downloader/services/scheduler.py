@@ -0,0 +1,181 @@
+"""Weighted fair scheduling of blocking extractions across priority lanes."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Mapping, Optional, TypeVar
+
+T = TypeVar("T")
+
+#: Lane weights used when none are configured.
+DEFAULT_LANES: Dict[str, int] = {"interactive": 4, "bulk": 1}
+
+_STRIDE = 1 << 20
+
+
+@dataclass(slots=True)
+class _Job:
+    func: Callable[[], Any]
+    future: "asyncio.Future[Any]"
+
+
+@dataclass(slots=True)
+class _Lane:
+    weight: int
+    queue: Deque[_Job]
+    #: Virtual time of the lane in stride scheduling; lowest goes next.
+    pass_value: int = 0
+    running: int = 0
+    #: When the lane last started a job, or became busy after being idle.
+    last_served: float = 0.0
+
+
+class PriorityScheduler:
+    """Run blocking callables on a fixed worker pool, sharing it between lanes.
+
+    Whenever a worker frees up, the next job comes from the non-empty lane
+    with the lowest virtual time (stride scheduling), so under contention
+    lanes receive worker time in proportion to their weights while an idle
+    lane's share goes to the others. A busy lane that has not started a job
+    for *max_wait* seconds goes ahead of everything else, which bounds how
+    long low-weight lanes can be starved without overriding the weights.
+
+    Running jobs are never preempted, so *reserved* workers are kept for the
+    highest-weight lane(s): the other lanes together never occupy more than
+    ``workers - reserved`` of them, and an interactive lookup does not have to
+    wait for a bulk extraction to finish.
+
+    The scheduler must be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        lanes: Mapping[str, int] | None = None,
+        *,
+        workers: int = 8,
+        max_wait: float = 2.0,
+        reserved: int = 1,
+    ) -> None:
+        weights = dict(lanes or DEFAULT_LANES)
+        if not weights:
+            raise ValueError("At least one lane is required")
+        self._lanes: Dict[str, _Lane] = {
+            name: _Lane(weight=max(1, int(weight)), queue=deque()) for name, weight in weights.items()
+        }
+        self._workers = max(1, workers)
+        self._max_wait = max_wait
+        # Reserving every worker would leave the other lanes with nothing.
+        self._reserved = min(max(0, reserved), self._workers - 1)
+        self._top_weight = max(lane.weight for lane in self._lanes.values())
+        self._active = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def lanes(self) -> tuple[str, ...]:
+        return tuple(self._lanes)
+
+    def weight(self, lane: str) -> int:
+        return self._lanes[lane].weight
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Queued and running job counts per lane."""
+
+        return {
+            name: {"queued": sum(not job.future.done() for job in lane.queue), "running": lane.running}
+            for name, lane in self._lanes.items()
+        }
+
+    async def run(self, lane: str, func: Callable[[], T]) -> T:
+        """Queue *func* in *lane* and return its result once a worker ran it.
+
+        Cancelling the caller drops the job if it has not started yet; a job
+        that is already running keeps its worker until *func* returns.
+        """
+
+        if lane not in self._lanes:
+            raise KeyError(f"Unknown lane: {lane}")
+        future: "asyncio.Future[T]" = asyncio.get_running_loop().create_future()
+        state = self._lanes[lane]
+        if not state.queue:
+            # A lane returning from idle must not claim credit for the time
+            # it did not use.
+            state.pass_value = max(state.pass_value, self._min_pass())
+            state.last_served = time.monotonic()
+        state.queue.append(_Job(func, future))
+        self._dispatch()
+        return await future
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _min_pass(self) -> int:
+        active = [lane.pass_value for lane in self._lanes.values() if lane.queue]
+        return min(active) if active else 0
+
+    def _dispatch(self) -> None:
+        while self._active < self._workers:
+            picked = self._pick()
+            if picked is None:
+                return
+            name, job = picked
+            self._start(name, job)
+
+    def _pick(self) -> Optional[tuple[str, _Job]]:
+        for lane in self._lanes.values():
+            # Drop jobs whose callers have gone away.
+            while lane.queue and lane.queue[0].future.done():
+                lane.queue.popleft()
+
+        candidates = [
+            (name, lane)
+            for name, lane in self._lanes.items()
+            if lane.queue and self._active < self._capacity(lane)
+        ]
+        if not candidates:
+            return None
+
+        now = time.monotonic()
+        name, lane = min(candidates, key=lambda item: item[1].last_served)
+        if now - lane.last_served < self._max_wait:
+            name, lane = min(candidates, key=lambda item: item[1].pass_value)
+        lane.pass_value += _STRIDE // lane.weight
+        lane.last_served = now
+        return name, lane.queue.popleft()
+
+    def _capacity(self, lane: _Lane) -> int:
+        """Workers *lane* may keep busy in total, counting other lanes' jobs."""
+
+        if lane.weight == self._top_weight:
+            return self._workers
+        return self._workers - self._reserved
+
+    def _start(self, name: str, job: _Job) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="extraction")
+        lane = self._lanes[name]
+        lane.running += 1
+        self._active += 1
+        inner = asyncio.get_running_loop().run_in_executor(self._executor, job.func)
+
+        def finished(task: "asyncio.Future[Any]") -> None:
+            lane.running -= 1
+            self._active -= 1
+            if task.cancelled():
+                job.future.cancel()
+            elif task.exception() is not None:
+                if not job.future.done():
+                    job.future.set_exception(task.exception())
+            elif not job.future.done():
+                job.future.set_result(task.result())
+            self._dispatch()
+
+        inner.add_done_callback(finished)
@@ -2,16 +2,60 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
+
 from fastapi import FastAPI
 
+from ..core.replay import build_extractor
+from ..core.urls import canonicalize_url
 from ..services import MediaService
+from ..services.refresh import load_url_list
+from ..services.scheduler import PriorityScheduler
 from .routes import create_router
+from .settings import Settings
+
+logger = logging.getLogger(__name__)
 
 
-def create_app(service: MediaService | None = None) -> FastAPI:
+def create_app(service: MediaService | None = None, settings: Settings | None = None) -> FastAPI:
     """Instantiate and configure the FastAPI application."""
 
-    service = service or MediaService()
-    app = FastAPI(title="YouTube Stream Inspector", version="2.0.0")
-    app.include_router(create_router(service))
+    settings = settings or Settings.from_env()
+    service = service or MediaService(build_extractor(settings.extractor, settings.corpus_dir or None))
+    scheduler = PriorityScheduler(
+        settings.lane_weights,
+        workers=settings.extraction_workers,
+        max_wait=settings.max_queue_wait,
+        reserved=settings.reserved_workers,
+    )
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        if settings.warmup_file:
+            await _warm_up(service, load_url_list(settings.warmup_file))
+        if settings.refresh_interval > 0:
+            service.start_background_refresh(settings.refresh_interval)
+        try:
+            yield
+        finally:
+            service.close()
+            scheduler.close()
+
+    app = FastAPI(title="YouTube Stream Inspector", version="2.0.0", lifespan=lifespan)
+    app.include_router(create_router(service, settings, scheduler))
     return app
+
+
+async def _warm_up(service: MediaService, urls: List[str]) -> None:
+    """Fill the cache before the first request is served."""
+
+    await asyncio.to_thread(service.warm_up, urls, wait_for=True)
+    keys = {canonicalize_url(url).cache_key for url in urls}
+    cached = sum(service.cache.peek(key) is not None for key in keys)
+    if cached < len(keys):
+        logger.warning("Cache warm-up: %d of %d URL(s) cached; see earlier errors", cached, len(keys))
+    else:
+        logger.info("Cache warm-up: %d URL(s) cached", cached)
@@ -0,0 +1,117 @@
+"""HTTP caching helpers: validators, freshness lifetime and content coding."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import time
+
+from fastapi import Request, Response
+
+try:  # pragma: no cover - optional dependency
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+#: Lifetime used when none of the stream URLs advertise an expiry.
+DEFAULT_MAX_AGE = 300
+#: Upper bound for the advertised lifetime regardless of the URL expiry.
+MAX_MAX_AGE = 6 * 60 * 60
+#: Stop serving cached copies this many seconds before the links expire,
+#: leaving the client time to actually start the download.
+EXPIRY_MARGIN = 120
+#: Bodies smaller than this are sent uncompressed.
+MIN_COMPRESS_SIZE = 1024
+
+
+def build_cached_response(
+    request: Request,
+    body: bytes,
+    *,
+    expires_at: int | None,
+    now: float | None = None,
+) -> Response:
+    """Wrap a serialized JSON *body* into a cacheable, compressed response.
+
+    The response carries a strong ``ETag`` derived from *body* and a
+    ``Cache-Control`` lifetime bounded by *expires_at*. Conditional requests
+    whose ``If-None-Match`` matches are answered with ``304 Not Modified``.
+    """
+
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    max_age = compute_max_age(expires_at, now=now)
+    coding = _negotiate_coding(request.headers.get("accept-encoding", ""), len(body))
+
+    headers = {
+        "Cache-Control": f"public, max-age={max_age}, s-maxage={max_age}" if max_age else "no-store",
+        "ETag": _format_etag(digest, coding),
+        "Vary": "Accept-Encoding",
+    }
+
+    if _matches(request.headers.get("if-none-match"), digest):
+        return Response(status_code=304, headers=headers)
+
+    if coding == "br":
+        body = brotli.compress(body, quality=5)
+        headers["Content-Encoding"] = "br"
+    elif coding == "gzip":
+        body = gzip.compress(body, compresslevel=6, mtime=0)
+        headers["Content-Encoding"] = "gzip"
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def compute_max_age(expires_at: int | None, *, now: float | None = None) -> int:
+    """Return the ``max-age`` in seconds for links expiring at *expires_at*."""
+
+    if expires_at is None:
+        return DEFAULT_MAX_AGE
+    current = time.time() if now is None else now
+    remaining = int(expires_at - current) - EXPIRY_MARGIN
+    return max(0, min(remaining, MAX_MAX_AGE))
+
+
+def _format_etag(digest: str, coding: str | None) -> str:
+    # Different content codings are different representations, so they must
+    # not share a strong validator.
+    if coding:
+        return f'"{digest}-{coding}"'
+    return f'"{digest}"'
+
+
+def _matches(header: str | None, digest: str) -> bool:
+    if not header:
+        return False
+    for candidate in header.split(","):
+        tag = candidate.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            # ``If-None-Match`` uses the weak comparison function.
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag == digest or tag.rsplit("-", 1)[0] == digest:
+            return True
+    return False
+
+
+def _negotiate_coding(header: str, size: int) -> str | None:
+    if size < MIN_COMPRESS_SIZE or not header:
+        return None
+    accepted: dict[str, float] = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
@@ -3,53 +3,278 @@
 from __future__ import annotations
 
 import asyncio
+import functools
+import secrets
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict
+from urllib.parse import urlsplit
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, HTMLResponse
+from pydantic import AnyHttpUrl
 
+from ..core import Deadline, DeadlineExceeded, MediaResult, ReplayMissError
 from ..services import MediaService
+from ..services.profiling import ProfileStore, profile_call
+from ..services.scheduler import PriorityScheduler
+from .caching import build_cached_response
 from .schemas import MediaLookupRequest, MediaSchema
+from .settings import Settings
 from .templates import INDEX_HTML
 
+#: Header through which clients may ask for a tighter (or longer) time budget.
+TIMEOUT_HEADER = "x-request-timeout"
+#: Non-standard status logged when the client went away before the answer.
+CLIENT_CLOSED_REQUEST = 499
+#: Response header naming the profile captured for the request.
+PROFILE_ID_HEADER = "X-Profile-Id"
+#: Request header naming the extraction lane; API key pinning takes precedence.
+PRIORITY_HEADER = "x-priority"
+
 
 class Dependencies:
     """Container for dependency callables."""
 
-    def __init__(self, service: MediaService) -> None:
+    def __init__(self, service: MediaService, settings: Settings, scheduler: PriorityScheduler) -> None:
         self._service = service
+        self._settings = settings
+        self._scheduler = scheduler
+        self._profiles: ProfileStore | None = None
+        if settings.profiling_enabled:
+            directory = settings.profile_dir or Path(tempfile.gettempdir()) / "downloader-profiles"
+            self._profiles = ProfileStore(directory, limit=settings.profile_limit)
 
     def get_service(self) -> MediaService:
         return self._service
 
+    def get_settings(self) -> Settings:
+        return self._settings
+
+    def get_scheduler(self) -> PriorityScheduler:
+        return self._scheduler
+
+    def get_profiles(self) -> ProfileStore | None:
+        return self._profiles
+
+    def require_admin(self, x_admin_token: str | None = Header(default=None)) -> ProfileStore:
+        token = self._settings.admin_token
+        if not token or self._profiles is None:
+            raise HTTPException(status_code=404, detail="Not Found")
+        if not x_admin_token or not _tokens_match(x_admin_token, token):
+            raise HTTPException(status_code=403, detail="Invalid admin token")
+        return self._profiles
+
+
+async def _lookup(
+    request: Request,
+    media_service: MediaService,
+    settings: Settings,
+    url: str,
+    cookies: str | None,
+    *,
+    scheduler: PriorityScheduler,
+    lane: str,
+    profiles: ProfileStore | None = None,
+) -> MediaResult:
+    """Run the blocking lookup on a *lane* of the scheduler under a deadline.
+
+    Anonymous lookups already in the cache are answered directly.
+
+    The deadline covers the time spent queued as well. The worker is told to
+    stop (cooperatively, at its next network request) as soon as the deadline
+    expires or the client disconnects, so the thread becomes available to
+    live requests again; a lookup still queued at that point never starts.
+    """
+
+    if cookies is None:
+        # Cache hits never wait behind extractions queued on the lane.
+        cached = media_service.get_cached(url)
+        if cached is not None:
+            return cached
+
+    deadline = Deadline(settings.resolve_deadline(request.headers.get(TIMEOUT_HEADER)))
+    call: Callable[[], MediaResult] = functools.partial(
+        media_service.fetch, url, cookies, deadline=deadline
+    )
+    if profiles is not None and _wants_profile(request, settings):
+        call = functools.partial(
+            profile_call,
+            profiles,
+            url,
+            call,
+            interval=settings.profile_interval,
+            on_saved=functools.partial(setattr, request.state, "profile_id"),
+        )
+    job = asyncio.ensure_future(scheduler.run(lane, call))
+    # An abandoned job may still fail later; retrieve its exception so it is not logged.
+    job.add_done_callback(lambda future: future.cancelled() or future.exception())
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        done, _ = await asyncio.wait(
+            {job, watcher},
+            timeout=deadline.remaining(),
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+    finally:
+        watcher.cancel()
+
+    if job not in done:
+        job.cancel()
+        if watcher in done:
+            deadline.cancel("client disconnected")
+            raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client disconnected")
+        deadline.cancel("deadline exceeded")
+        raise HTTPException(status_code=504, detail="Extraction deadline exceeded")
+
+    try:
+        return job.result()
+    except DeadlineExceeded as exc:
+        raise HTTPException(status_code=504, detail=str(exc)) from exc
+    except ReplayMissError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except Exception as exc:  # pragma: no cover - propagate extractor errors
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _select_lane(request: Request, settings: Settings, scheduler: PriorityScheduler, default: str) -> str:
+    """Pick the lane of *request*.
+
+    An API key pinned to a lane decides outright. Otherwise same-origin
+    browser requests (the bundled UI) use the UI lane and everything else
+    *default*; ``X-Priority`` may then only move the request to a lane of
+    lower or equal weight, so unauthenticated clients cannot jump the queue.
+    """
+
+    api_key = request.headers.get("x-api-key")
+    if api_key:
+        pinned = settings.api_key_lane_map.get(api_key)
+        if pinned in scheduler.lanes:
+            return pinned
+    if _is_same_origin(request) and settings.ui_lane in scheduler.lanes:
+        default = settings.ui_lane
+    if default not in scheduler.lanes:
+        default = min(scheduler.lanes, key=scheduler.weight)
+    requested = request.headers.get(PRIORITY_HEADER)
+    if requested in scheduler.lanes and scheduler.weight(requested) <= scheduler.weight(default):
+        return requested
+    return default
 
-def create_router(service: MediaService) -> APIRouter:
-    deps = Dependencies(service)
+
+def _is_same_origin(request: Request) -> bool:
+    # Browsers set these headers themselves; page scripts cannot forge them.
+    site = request.headers.get("sec-fetch-site")
+    if site is not None:
+        return site == "same-origin"
+    origin = request.headers.get("origin")
+    return bool(origin) and urlsplit(origin).netloc == request.headers.get("host")
+
+
+def _wants_profile(request: Request, settings: Settings) -> bool:
+    if settings.profile_all:
+        return True
+    if request.headers.get("x-profile") != "1":
+        return False
+    supplied = request.headers.get("x-admin-token")
+    return bool(settings.admin_token and supplied) and _tokens_match(supplied, settings.admin_token)
+
+
+def _tokens_match(supplied: str, expected: str) -> bool:
+    # ``compare_digest`` rejects non-ASCII ``str``; header values are latin-1.
+    return secrets.compare_digest(supplied.encode("latin-1", "replace"), expected.encode("utf-8"))
+
+
+def _profile_headers(request: Request) -> Dict[str, str]:
+    profile_id = getattr(request.state, "profile_id", None)
+    return {PROFILE_ID_HEADER: profile_id} if profile_id else {}
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+def create_router(
+    service: MediaService,
+    settings: Settings | None = None,
+    scheduler: PriorityScheduler | None = None,
+) -> APIRouter:
+    settings = settings or Settings()
+    scheduler = scheduler or PriorityScheduler(
+        settings.lane_weights,
+        workers=settings.extraction_workers,
+        max_wait=settings.max_queue_wait,
+        reserved=settings.reserved_workers,
+    )
+    deps = Dependencies(service, settings, scheduler)
     router = APIRouter()
 
     @router.get("/", response_class=HTMLResponse)
     async def index() -> HTMLResponse:
         return HTMLResponse(INDEX_HTML)
 
+    @router.get("/api/streams", response_model=MediaSchema)
+    async def get_streams(
+        request: Request,
+        url: AnyHttpUrl = Query(..., description="Media page URL supported by yt-dlp."),
+        media_service: MediaService = Depends(deps.get_service),
+        app_settings: Settings = Depends(deps.get_settings),
+        scheduler: PriorityScheduler = Depends(deps.get_scheduler),
+        profiles: ProfileStore | None = Depends(deps.get_profiles),
+    ) -> Response:
+        result = await _lookup(
+            request,
+            media_service,
+            app_settings,
+            str(url),
+            None,
+            scheduler=scheduler,
+            lane=_select_lane(request, app_settings, scheduler, app_settings.get_lane),
+            profiles=profiles,
+        )
+        body = MediaSchema.model_validate(result).model_dump_json().encode("utf-8")
+        response = build_cached_response(request, body, expires_at=result.expires_at)
+        response.headers.update(_profile_headers(request))
+        return response
+
     @router.post("/api/streams", response_model=MediaSchema)
     async def list_streams(
-        request: MediaLookupRequest,
+        lookup: MediaLookupRequest,
+        request: Request,
+        response: Response,
         media_service: MediaService = Depends(deps.get_service),
+        app_settings: Settings = Depends(deps.get_settings),
+        scheduler: PriorityScheduler = Depends(deps.get_scheduler),
+        profiles: ProfileStore | None = Depends(deps.get_profiles),
     ) -> MediaSchema:
-        loop = asyncio.get_running_loop()
         cookies = None
-        if request.cookies is not None:
-            stripped = request.cookies.strip()
+        if lookup.cookies is not None:
+            stripped = lookup.cookies.strip()
             cookies = stripped or None
-        try:
-            result = await loop.run_in_executor(
-                None,
-                media_service.get_media,
-                str(request.url),
-                cookies,
-            )
-        except Exception as exc:  # pragma: no cover - propagate extractor errors
-            raise HTTPException(status_code=400, detail=str(exc)) from exc
-
+        result = await _lookup(
+            request,
+            media_service,
+            app_settings,
+            str(lookup.url),
+            cookies,
+            scheduler=scheduler,
+            lane=_select_lane(request, app_settings, scheduler, app_settings.post_lane),
+            profiles=profiles,
+        )
+        response.headers.update(_profile_headers(request))
         return MediaSchema.model_validate(result)
 
+    @router.get("/admin/profiles")
+    async def list_profiles(profiles: ProfileStore = Depends(deps.require_admin)) -> Dict[str, Any]:
+        return {"directory": str(profiles.directory), "profiles": profiles.list()}
+
+    @router.get("/admin/profiles/{name}")
+    async def get_profile(name: str, profiles: ProfileStore = Depends(deps.require_admin)) -> FileResponse:
+        path = profiles.path_for(name)
+        if path is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return FileResponse(path, media_type="text/plain; charset=utf-8", filename=name)
+
     return router
@@ -0,0 +1,111 @@
+"""Runtime configuration of the web application."""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping
+
+_ENV_PREFIX = "DOWNLOADER_"
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Tunables of the HTTP layer.
+
+    Every field can be overridden with an environment variable named after it,
+    e.g. ``DOWNLOADER_MAX_DEADLINE=30``; see :meth:`from_env`.
+    """
+
+    #: Extractor behind the default service: ``live``, ``record`` or ``replay``.
+    extractor: str = "live"
+    #: Payload corpus used by the ``record`` and ``replay`` extractors.
+    corpus_dir: str = ""
+    #: Time budget (seconds) of a lookup when the client does not ask for one.
+    default_deadline: float = 25.0
+    #: Upper bound for budgets requested via the ``X-Request-Timeout`` header.
+    max_deadline: float = 60.0
+    #: Token guarding the ``/admin`` endpoints (disabled while empty). Requests
+    #: carrying ``X-Admin-Token: <token>`` and ``X-Profile: 1`` are profiled.
+    admin_token: str = ""
+    #: Profile every lookup regardless of headers (diagnostics only).
+    profile_all: bool = False
+    #: Where profiles are kept; defaults to ``<tmp>/downloader-profiles``.
+    profile_dir: str = ""
+    #: Maximum number of profiles kept on disk.
+    profile_limit: int = 50
+    #: Stack sampling interval in seconds.
+    profile_interval: float = 0.005
+    #: File with one URL per line whose results are extracted at startup.
+    warmup_file: str = ""
+    #: Seconds between sweeps refreshing hot cache entries; ``0`` disables them.
+    refresh_interval: float = 30.0
+    #: Worker threads shared by all extraction lanes.
+    extraction_workers: int = 8
+    #: Lane weights as ``name=weight`` pairs, e.g. ``interactive=4,bulk=1``.
+    lanes: str = "interactive=4,bulk=1"
+    #: Lane of requests made by the bundled web UI (same-origin browser requests).
+    ui_lane: str = "interactive"
+    #: Lane of other ``POST /api/streams`` requests unless overridden.
+    post_lane: str = "bulk"
+    #: Lane of ``GET /api/streams`` unless overridden.
+    get_lane: str = "bulk"
+    #: API keys pinned to lanes as ``key=lane`` pairs; matched on ``X-API-Key``.
+    api_key_lanes: str = ""
+    #: A busy lane not served for this many seconds goes first.
+    max_queue_wait: float = 2.0
+    #: Workers kept free for the highest-weight lane(s).
+    reserved_workers: int = 1
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] | None = None) -> "Settings":
+        """Build settings from ``DOWNLOADER_*`` environment variables."""
+
+        environ = os.environ if environ is None else environ
+        overrides = {}
+        for name, spec in cls.__dataclass_fields__.items():
+            value = environ.get(_ENV_PREFIX + name.upper())
+            if value is not None:
+                overrides[name] = _coerce(spec.default, value)
+        return cls(**overrides)
+
+    def resolve_deadline(self, requested: str | None) -> float:
+        """Return the budget for a request asking for *requested* seconds."""
+
+        if requested:
+            try:
+                value = float(requested)
+            except ValueError:
+                value = 0.0
+            if value > 0:
+                return min(value, self.max_deadline)
+        return min(self.default_deadline, self.max_deadline)
+
+    @property
+    def lane_weights(self) -> Dict[str, int]:
+        return {name: int(weight) for name, weight in _parse_pairs(self.lanes).items()}
+
+    @property
+    def api_key_lane_map(self) -> Dict[str, str]:
+        return _parse_pairs(self.api_key_lanes)
+
+    @property
+    def profiling_enabled(self) -> bool:
+        return bool(self.admin_token) or self.profile_all
+
+
+def _coerce(default: Any, value: str) -> Any:
+    if isinstance(default, bool):
+        return value.strip().lower() in {"1", "true", "yes", "on"}
+    if isinstance(default, (int, float)):
+        return type(default)(value)
+    return value
+
+
+def _parse_pairs(value: str) -> Dict[str, str]:
+    pairs = {}
+    for item in value.split(","):
+        name, separator, setting = item.partition("=")
+        if separator and name.strip():
+            pairs[name.strip()] = setting.strip()
+    return pairs
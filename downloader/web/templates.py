@@ -215,9 +215,7 @@ INDEX_HTML = """
         try {
           const response = await fetch('/api/streams', {
             method: 'POST',
-            headers: {
-              'Content-Type': 'application/json',
-            },
+            headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ url, cookies: cookies ?? null }),
           });
           const payload = await response.json();
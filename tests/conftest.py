@@ -0,0 +1,46 @@
+import asyncio
+from urllib.parse import urlencode
+
+import pytest
+
+
+@pytest.fixture
+def disconnecting_get():
+    """Send a GET straight to an ASGI app and hang up before the answer.
+
+    ``TestClient`` cannot simulate a client going away mid-request, so this
+    returns a coroutine function ``(app, path, query, *, after=0.05)`` that
+    reports ``http.disconnect`` *after* seconds and returns the status code.
+    """
+
+    async def get(app, path, query, *, after=0.05):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode("ascii"),
+            "query_string": urlencode(query).encode("ascii"),
+            "root_path": "",
+            "headers": [(b"host", b"testserver")],
+            "client": ("127.0.0.1", 0),
+            "server": ("testserver", 80),
+        }
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+        sent = []
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await asyncio.sleep(after)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        await app(scope, receive, send)
+        return sent[0]["status"]
+
+    return get
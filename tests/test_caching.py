@@ -0,0 +1,134 @@
+from pathlib import Path
+import gzip
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from downloader.core import MediaResult, MediaStream
+from downloader.services import MediaService
+from downloader.web.app import create_app
+from downloader.web.caching import build_cached_response, compute_max_age
+from downloader.web.settings import Settings
+
+
+def make_request(headers=None):
+    raw = [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/api/streams", "headers": raw})
+
+
+def make_stream(url):
+    return MediaStream(
+        format_id="18",
+        mime_type="video/mp4",
+        resolution="640x360",
+        bitrate_kbps=None,
+        fps=None,
+        filesize_bytes=None,
+        url=url,
+    )
+
+
+def test_result_expiry_is_earliest_stream_expiry():
+    result = MediaResult(
+        title="",
+        page_url="https://example.com",
+        video_streams=[make_stream("https://cdn.example/v?expire=2000&x=1")],
+        audio_streams=[
+            make_stream("https://cdn.example/a/expire/1500/id/1"),
+            make_stream("https://cdn.example/plain"),
+        ],
+    )
+
+    assert result.expires_at == 1500
+
+
+def test_max_age_tracks_expiry():
+    assert compute_max_age(None) > 0
+    assert compute_max_age(1000, now=2000) == 0
+    assert 0 < compute_max_age(5000, now=1000) < 4000
+
+
+def test_response_is_compressed_and_validated():
+    body = b'{"streams": "' + b"x" * 4096 + b'"}'
+
+    response = build_cached_response(
+        make_request({"Accept-Encoding": "gzip"}), body, expires_at=5000, now=1000
+    )
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(response.body) == body
+    assert "max-age=" in response.headers["cache-control"]
+
+    etag = response.headers["etag"]
+    conditional = build_cached_response(
+        make_request({"If-None-Match": etag}), body, expires_at=5000, now=1000
+    )
+    assert conditional.status_code == 304
+    assert conditional.body == b""
+
+
+def test_stale_validator_returns_full_body():
+    body = b'{"title": "short"}'
+    response = build_cached_response(
+        make_request({"If-None-Match": '"deadbeef"'}), body, expires_at=None
+    )
+
+    assert response.status_code == 200
+    assert response.body == body
+    assert "content-encoding" not in response.headers
+
+
+class StubExtractor:
+    def __init__(self):
+        self.calls = 0
+
+    def extract(self, url, cookies=None, deadline=None):
+        self.calls += 1
+        expire = int(time.time()) + 3600
+        return {
+            "title": "Stub " + "t" * 2048,
+            "webpage_url": url,
+            "formats": [
+                {
+                    "format_id": "18",
+                    "url": f"https://cdn.example/v?expire={expire}",
+                    "vcodec": "avc1",
+                    "acodec": "mp4a.40.2",
+                    "ext": "mp4",
+                }
+            ],
+        }
+
+
+def test_get_route_serves_cacheable_responses():
+    extractor = StubExtractor()
+    service = MediaService(extractor)
+    client = TestClient(create_app(service, Settings()))
+    url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+    invalid = client.get("/api/streams", params={"url": "not a url"})
+    first = client.get("/api/streams", params={"url": url}, headers={"Accept-Encoding": "gzip"})
+    revalidated = client.get(
+        "/api/streams",
+        params={"url": url},
+        headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]},
+    )
+
+    assert invalid.status_code == 422
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["vary"] == "Accept-Encoding"
+    assert "max-age=" in first.headers["cache-control"]
+    # The client decodes the gzip body transparently.
+    assert first.json()["video_streams"][0]["format_id"] == "18"
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert extractor.calls == 1
+    # One miss for the first lookup, one hit for the revalidation.
+    assert (service.cache.misses, service.cache.hits) == (1, 1)
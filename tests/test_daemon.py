@@ -0,0 +1,164 @@
+from pathlib import Path
+import json
+import os
+import socket
+import stat
+import sys
+import threading
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from downloader import daemon
+from downloader.cli import main
+from downloader.core import MediaResult
+from downloader.services import MediaService
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+class CountingExtractor:
+    def __init__(self):
+        self.calls = 0
+
+    def extract(self, url, cookies=None, deadline=None):
+        self.calls += 1
+        return {
+            "title": "From daemon",
+            "webpage_url": URL,
+            "formats": [
+                {
+                    "format_id": "140",
+                    "url": f"https://cdn.example/audio?expire={int(time.time()) + 3600}",
+                    "vcodec": "none",
+                    "acodec": "mp4a.40.2",
+                    "ext": "m4a",
+                    "abr": 128,
+                }
+            ],
+        }
+
+
+@pytest.fixture
+def running_daemon(tmp_path, monkeypatch):
+    socket_path = tmp_path / "d.sock"
+    monkeypatch.setenv(daemon.SOCKET_ENV, str(socket_path))
+    monkeypatch.delenv("DOWNLOADER_NO_DAEMON", raising=False)
+    extractor = CountingExtractor()
+    server = daemon.DaemonServer(socket_path, MediaService(extractor), idle_timeout=0)
+    thread = threading.Thread(target=server.serve_until_idle, daemon=True)
+    thread.start()
+    yield server, extractor
+    server.shutdown()
+    thread.join(timeout=5)
+
+
+def test_round_trip_reuses_warm_service(running_daemon):
+    server, extractor = running_daemon
+
+    first = daemon.lookup(URL)
+    second = daemon.lookup("https://youtu.be/dQw4w9WgXcQ")
+
+    assert isinstance(first, MediaResult)
+    assert first == second
+    assert first.audio_streams[0].format_id == "140"
+    assert extractor.calls == 1
+    assert stat.S_IMODE(server.socket_path.stat().st_mode) == 0o600
+    assert daemon.call({"command": "status"})["requests"] == 3
+
+
+def test_cli_uses_daemon_unless_disabled(running_daemon, capsys, monkeypatch):
+    _, extractor = running_daemon
+
+    assert main([URL, "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)["title"] == "From daemon"
+    assert extractor.calls == 1
+
+    local = MediaResult(title="Local", page_url=URL, video_streams=[], audio_streams=[])
+    monkeypatch.setattr("downloader.cli._resolve_locally", lambda args: local)
+    assert main([URL, "--no-daemon", "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)["title"] == "Local"
+    assert extractor.calls == 1
+
+
+def test_cli_falls_back_without_daemon(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv(daemon.SOCKET_ENV, str(tmp_path / "missing.sock"))
+
+    with pytest.raises(daemon.DaemonUnavailable):
+        daemon.lookup(URL)
+
+    local = MediaResult(title="Local", page_url=URL, video_streams=[], audio_streams=[])
+    monkeypatch.setattr("downloader.cli._resolve_locally", lambda args: local)
+    assert main([URL, "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)["title"] == "Local"
+
+
+def test_idle_daemon_shuts_down_and_removes_socket(tmp_path):
+    socket_path = tmp_path / "idle.sock"
+    socket_path.write_text("stale")
+    server = daemon.DaemonServer(socket_path, MediaService(CountingExtractor()), idle_timeout=0.3)
+    thread = threading.Thread(target=server.serve_until_idle, daemon=True)
+
+    started = time.monotonic()
+    thread.start()
+    daemon.call({"command": "status"}, socket_path=socket_path)
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert 0.3 <= time.monotonic() - started < 3
+    assert not socket_path.exists()
+
+
+def test_sockets_of_other_users_are_not_trusted(running_daemon, monkeypatch):
+    real_uid = os.getuid()
+    monkeypatch.setattr(daemon.os, "getuid", lambda: real_uid + 1)
+
+    with pytest.raises(daemon.DaemonUnavailable):
+        daemon.lookup(URL)
+
+
+def test_wedged_daemon_times_out(tmp_path, monkeypatch):
+    socket_path = tmp_path / "wedged.sock"
+    monkeypatch.setenv(daemon.SOCKET_ENV, str(socket_path))
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        listener.bind(str(socket_path))
+        listener.listen(1)
+        started = time.monotonic()
+
+        with pytest.raises(daemon.DaemonUnavailable):
+            daemon.lookup(URL, timeout=0.2)
+
+    assert time.monotonic() - started < 2
+
+
+@pytest.mark.parametrize("reply", [b"not json\n", b"[1, 2]\n", b'{"ok": true}\n', None])
+def test_broken_daemon_counts_as_unavailable(tmp_path, monkeypatch, capsys, reply):
+    socket_path = tmp_path / "broken.sock"
+    monkeypatch.setenv(daemon.SOCKET_ENV, str(socket_path))
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(socket_path))
+    listener.listen(1)
+
+    def serve_once():
+        connection, _ = listener.accept()
+        with connection:
+            connection.recv(4096)
+            if reply is None:
+                # Drop the connection with a reset instead of an answer.
+                connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, b"\x01\x00\x00\x00\x00\x00\x00\x00")
+            else:
+                connection.sendall(reply)
+
+    server = threading.Thread(target=serve_once, daemon=True)
+    server.start()
+    local = MediaResult(title="Local", page_url=URL, video_streams=[], audio_streams=[])
+    monkeypatch.setattr("downloader.cli._resolve_locally", lambda args: local)
+
+    assert main([URL, "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)["title"] == "Local"
+    server.join(5)
+    listener.close()
@@ -0,0 +1,108 @@
+from pathlib import Path
+import asyncio
+import sys
+import threading
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from downloader.core import Deadline, DeadlineExceeded
+from downloader.core.ytdlp import YtDlpExtractor
+from downloader.services import MediaService
+from downloader.web.app import create_app
+from downloader.web.settings import Settings
+
+
+SLOW_URL = "https://example.com/slow"
+
+
+class SlowExtractor:
+    def __init__(self):
+        self.abandoned = threading.Event()
+
+    def extract(self, url, cookies=None, deadline=None):
+        while True:
+            try:
+                deadline.check()
+            except DeadlineExceeded:
+                self.abandoned.set()
+                raise
+            time.sleep(0.01)
+
+
+def test_settings_cap_client_deadline():
+    settings = Settings(default_deadline=20, max_deadline=30)
+
+    assert settings.resolve_deadline(None) == 20
+    assert settings.resolve_deadline("5") == 5
+    assert settings.resolve_deadline("600") == 30
+    assert settings.resolve_deadline("nonsense") == 20
+    assert Settings.from_env({"DOWNLOADER_MAX_DEADLINE": "12"}).max_deadline == 12
+
+
+def test_expired_deadline_returns_504_and_frees_worker():
+    extractor = SlowExtractor()
+    app = create_app(MediaService(extractor), Settings())
+
+    response = TestClient(app).get("/api/streams", params={"url": SLOW_URL}, headers={"X-Request-Timeout": "0.1"})
+
+    assert response.status_code == 504
+    assert extractor.abandoned.wait(1)
+
+
+def test_client_disconnect_cancels_extraction(disconnecting_get):
+    extractor = SlowExtractor()
+    app = create_app(MediaService(extractor), Settings())
+
+    status = asyncio.run(disconnecting_get(app, "/api/streams", {"url": SLOW_URL}))
+
+    assert status == 499
+    assert extractor.abandoned.wait(1)
+
+
+def test_extractors_without_deadline_parameter_still_work():
+    class BaselineExtractor:
+        def extract(self, url, cookies=None):
+            return {"title": "T", "webpage_url": url, "formats": []}
+
+    result = MediaService(BaselineExtractor()).get_media("https://example.com/v", deadline=Deadline(5))
+
+    assert result.title == "T"
+
+
+def test_extractor_sizes_timeouts_to_deadline(monkeypatch):
+    captured = {}
+
+    class RecordingYoutubeDL:
+        def __init__(self, params):
+            captured["options"] = params
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return False
+
+        def urlopen(self, req):
+            return req
+
+        def extract_info(self, url, download, **kwargs):
+            deadline.cancel("test")
+            self.urlopen("https://example.com/page")
+            return {}
+
+    monkeypatch.setattr("downloader.core.ytdlp.YoutubeDL", RecordingYoutubeDL)
+    deadline = Deadline(5)
+
+    with pytest.raises(DeadlineExceeded):
+        YtDlpExtractor().extract("https://example.com/video", deadline=deadline)
+
+    options = captured["options"]
+    assert options["socket_timeout"] <= 5
+    assert options["retries"] == 0
+    assert options["extractor_retries"] == 0
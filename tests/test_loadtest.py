@@ -0,0 +1,48 @@
+from pathlib import Path
+import asyncio
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from downloader.loadtest import ASGIClient, FakeExtractor, Workload, percentile, run_workload
+from downloader.services import MediaService
+from downloader.web.app import create_app
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(n) for n in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+
+def test_schedule_mixes_hot_and_unique_urls():
+    workload = Workload(rate=200, duration=2, hit_ratio=0.5, hot_set=3, arrival="uniform", seed=7)
+    schedule = workload.schedule()
+    hot = set(workload.hot_urls)
+
+    assert len(schedule) == 399
+    assert all(url in hot for _, kind, url in schedule if kind == "hit")
+    assert not any(url in hot for _, kind, url in schedule if kind == "miss")
+
+
+def test_in_process_run_reports_latency():
+    app = create_app(MediaService(FakeExtractor(latency=0.0, jitter=0.0, formats=3)))
+    workload = Workload(rate=50, duration=0.2, hit_ratio=0.5, hot_set=2, seed=1)
+
+    async def run():
+        client = ASGIClient(app)
+        await client.start()
+        try:
+            return await run_workload(client.request, workload)
+        finally:
+            await client.stop()
+
+    report = asyncio.run(run())
+
+    assert report["errors"] == 0
+    assert report["requests"] > 0
+    assert set(report["latency_ms"]) >= {"p50", "p95", "p99"}
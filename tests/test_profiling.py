@@ -0,0 +1,77 @@
+from collections import Counter
+from pathlib import Path
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from downloader.services import MediaService
+from downloader.services.profiling import ProfileStore, profile_call
+from downloader.web.app import create_app
+from downloader.web.settings import Settings
+
+
+def busy_lookup():
+    deadline = time.monotonic() + 0.1
+    while time.monotonic() < deadline:
+        pass
+    return "done"
+
+
+def failing_lookup():
+    busy_lookup()
+    raise RuntimeError("boom")
+
+
+def test_profile_call_writes_folded_stacks(tmp_path):
+    store = ProfileStore(tmp_path)
+    saved = []
+
+    result = profile_call(store, "https://youtu.be/x", busy_lookup, interval=0.001, on_saved=saved.append)
+
+    assert result == "done"
+    content = store.path_for(saved[0]).read_text(encoding="utf-8")
+    stack, count = content.splitlines()[0].rsplit(" ", 1)
+    assert stack.startswith("busy_lookup (test_profiling.py:")
+    assert int(count) > 0
+
+
+def test_profile_is_kept_when_lookup_fails(tmp_path):
+    store = ProfileStore(tmp_path)
+
+    with pytest.raises(RuntimeError):
+        profile_call(store, "failing", failing_lookup, interval=0.001)
+
+    assert len(store.list()) == 1
+
+
+def test_store_is_bounded_and_rejects_foreign_paths(tmp_path):
+    store = ProfileStore(tmp_path / "profiles", limit=2)
+    names = [store.save(f"p{n}", Counter({"a;b": n + 1})) for n in range(3)]
+
+    assert [entry["name"] for entry in store.list()] == names[:0:-1]
+    assert store.path_for(names[0]) is None
+    assert store.path_for("../" + names[1]) is None
+
+
+def test_unsampled_call_leaves_no_profile(tmp_path):
+    store = ProfileStore(tmp_path)
+    saved = []
+
+    assert profile_call(store, "cache-hit", lambda: "hit", interval=10, on_saved=saved.append) == "hit"
+
+    assert saved == []
+    assert store.list() == []
+
+
+def test_non_ascii_admin_token_is_rejected(tmp_path):
+    client = TestClient(create_app(MediaService(), Settings(admin_token="secret", profile_dir=str(tmp_path))))
+
+    response = client.get("/admin/profiles", headers={"X-Admin-Token": b"s\xe9cret"})
+
+    assert response.status_code == 403
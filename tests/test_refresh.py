@@ -0,0 +1,137 @@
+from pathlib import Path
+import sys
+import threading
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi.testclient import TestClient
+
+from downloader.core import MediaResult
+from downloader.services import MediaService, RefreshPolicy
+from downloader.web.app import create_app
+from downloader.web.settings import Settings
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+KEY = "Youtube:dQw4w9WgXcQ"
+
+
+class VersionedExtractor:
+    """Returns a new title on every call, with links valid for *ttl* seconds."""
+
+    def __init__(self, ttl=3600, delay=0.0):
+        self.ttl = ttl
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def extract(self, url, cookies=None, deadline=None):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            version = self.calls
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        expire = int(time.time()) + self.ttl
+        return {
+            "title": f"v{version}",
+            "webpage_url": url,
+            "formats": [
+                {"format_id": "18", "url": f"https://cdn.example/v?expire={expire}", "vcodec": "avc1", "acodec": "mp4a"}
+            ],
+        }
+
+
+def wait_idle(service):
+    deadline = time.monotonic() + 2
+    while service._refresher.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_stale_entry_is_served_while_refreshing():
+    extractor = VersionedExtractor()
+    service = MediaService(extractor)
+    now = time.time()
+    stale = MediaResult(title="old", page_url=URL, video_streams=[], audio_streams=[])
+    service.cache.put(KEY, stale, now - 1, url=URL, stale_until=now + 60)
+
+    assert service.get_media(URL).title == "old"
+    wait_idle(service)
+    assert service.get_media(URL).title == "v1"
+    assert extractor.calls == 1
+
+
+def test_only_hot_entries_are_refreshed_ahead_of_expiry():
+    extractor = VersionedExtractor(ttl=3600)
+    service = MediaService(extractor, refresh_policy=RefreshPolicy(hot_threshold=2, refresh_ahead=3000))
+    cold_url = "https://youtu.be/aaaaaaaaaaa"
+    service.get_media(URL)
+    service.get_media(URL)
+    service.get_media(cold_url)
+
+    # Both entries are fresh; only the hot one is inside its refresh window.
+    later = time.time() + 3000
+    assert service.refresh_due(now=later) == 1
+    wait_idle(service)
+    assert extractor.calls == 3
+    assert service.cache.peek(KEY).result.title == "v3"
+
+
+def test_sweep_skips_cold_entries_past_freshness():
+    extractor = VersionedExtractor()
+    service = MediaService(extractor, refresh_policy=RefreshPolicy(hot_threshold=2))
+    now = time.time()
+    stale = MediaResult(title="old", page_url=URL, video_streams=[], audio_streams=[])
+    service.cache.put(KEY, stale, now - 1, url=URL, stale_until=now + 60, hits=1)
+
+    assert service.refresh_due(now=now) == 0
+    assert extractor.calls == 0
+
+
+def test_warm_up_populates_cache_with_bounded_concurrency():
+    extractor = VersionedExtractor(delay=0.02)
+    service = MediaService(extractor, refresh_policy=RefreshPolicy(max_concurrency=2, hot_threshold=3))
+    urls = [f"https://youtu.be/{n:011d}" for n in range(6)]
+
+    assert service.warm_up(urls, wait_for=True) == 6
+    wait_idle(service)
+
+    assert len(service.cache) == 6
+    assert extractor.max_active <= 2
+    assert all(entry.hits >= 3 for _, entry in service.cache.items())
+    service.close()
+
+
+def test_warm_up_queues_every_url_past_max_pending():
+    extractor = VersionedExtractor()
+    service = MediaService(extractor, refresh_policy=RefreshPolicy(max_concurrency=2, max_pending=4))
+    urls = [f"https://youtu.be/{n:011d}" for n in range(20)]
+
+    assert service.warm_up(urls, wait_for=True) == 20
+    wait_idle(service)
+
+    assert len(service.cache) == 20
+    assert extractor.max_active <= 2
+    service.close()
+
+
+def test_service_survives_app_restarts(tmp_path):
+    warmup = tmp_path / "warmup.txt"
+    warmup.write_text(URL + "\n")
+    service = MediaService(VersionedExtractor())
+    settings = Settings(warmup_file=str(warmup))
+
+    with TestClient(create_app(service, settings)):
+        assert service.cache.peek(KEY) is not None
+    service.cache.put(KEY, service.cache.peek(KEY).result, time.time() - 1, url=URL, stale_until=time.time() + 60)
+
+    with TestClient(create_app(service, settings)):
+        # Startup warms the entry again, which needs a working refresher.
+        assert service.cache.peek(KEY).fresh_until > time.time()
+        assert service._refresher._sweeper is not None
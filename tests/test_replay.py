@@ -0,0 +1,134 @@
+from pathlib import Path
+import io
+import json
+import sys
+import tarfile
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from downloader.cli import main
+from downloader.core import PayloadStore, RecordingExtractor, ReplayExtractor, ReplayMissError
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+class StaticExtractor:
+    def __init__(self, expire):
+        self.expire = expire
+        self.calls = 0
+
+    def extract(self, url, cookies=None, deadline=None):
+        self.calls += 1
+        return {
+            "title": "Recorded",
+            "webpage_url": URL,
+            "formats": [
+                {
+                    "format_id": "18",
+                    "url": f"https://cdn.example/videoplayback?expire={self.expire}&id=1",
+                    "vcodec": "avc1",
+                    "acodec": "none",
+                    "ext": "mp4",
+                }
+            ],
+        }
+
+
+def test_recorded_payloads_are_content_addressed(tmp_path):
+    store = PayloadStore(tmp_path)
+    recorder = RecordingExtractor(StaticExtractor(expire=2000000000), store)
+
+    recorder.extract(URL)
+    recorder.extract("https://youtu.be/dQw4w9WgXcQ")
+
+    assert len(store) == 1
+    assert len(list(tmp_path.glob("objects/*/*.json.gz"))) == 1
+    assert store.get("https://m.youtube.com/watch?v=dQw4w9WgXcQ")["title"] == "Recorded"
+    with pytest.raises(ReplayMissError):
+        store.get("https://youtu.be/aaaaaaaaaaa")
+
+
+def test_replay_shifts_expiry_only_when_asked(tmp_path):
+    store = PayloadStore(tmp_path)
+    store.put(URL, StaticExtractor(expire=1000).extract(URL))
+    index = json.loads((tmp_path / "index.json").read_text())
+    for entry in index.values():
+        entry["recorded_at"] -= 500
+    (tmp_path / "index.json").write_text(json.dumps(index))
+
+    store = PayloadStore(tmp_path)
+
+    assert "expire=1000&" in ReplayExtractor(store).extract(URL)["formats"][0]["url"]
+    assert "expire=1500&" in ReplayExtractor(store, shift_expiry=True).extract(URL)["formats"][0]["url"]
+
+
+def test_cli_replays_imported_corpus_offline(tmp_path, capsys):
+    source = PayloadStore(tmp_path / "source")
+    source.put(URL, StaticExtractor(expire=int(time.time()) + 3600).extract(URL))
+    archive = tmp_path / "corpus.tar"
+    source.export_archive(archive)
+
+    corpus = tmp_path / "replayed"
+    assert main(["--corpus", str(corpus), "--import-corpus", str(archive)]) == 0
+    capsys.readouterr()
+
+    assert main(["https://youtu.be/dQw4w9WgXcQ", "--extractor", "replay", "--corpus", str(corpus), "--json"]) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result["title"] == "Recorded"
+    assert result["video_streams"][0]["format_id"] == "18"
+
+
+def test_cookie_lookups_are_not_recorded(tmp_path):
+    store = PayloadStore(tmp_path)
+    recorder = RecordingExtractor(StaticExtractor(expire=2000000000), store)
+
+    recorder.extract(URL, cookies="# Netscape HTTP Cookie File")
+
+    assert len(store) == 0
+
+
+def write_archive(path, index):
+    data = json.dumps(index).encode("utf-8")
+    with tarfile.open(path, "w") as tar:
+        info = tarfile.TarInfo("index.json")
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+
+
+@pytest.mark.parametrize(
+    "entry",
+    [
+        {"url": URL, "digest": "../../index", "recorded_at": 0},
+        {"digest": "a" * 64, "recorded_at": 0},
+        {"url": URL, "digest": "a" * 64, "recorded_at": "yesterday"},
+        "a" * 64,
+    ],
+)
+def test_import_rejects_malformed_index_entries(tmp_path, entry):
+    archive = tmp_path / "crafted.tar"
+    write_archive(archive, {"Youtube:dQw4w9WgXcQ": entry})
+    store = PayloadStore(tmp_path / "corpus")
+
+    with pytest.raises(ValueError):
+        store.import_archive(archive)
+
+    assert len(store) == 0
+
+
+def test_running_store_sees_later_imports(tmp_path):
+    serving = PayloadStore(tmp_path / "corpus")
+    replay = ReplayExtractor(serving)
+    with pytest.raises(ReplayMissError):
+        replay.extract(URL)
+
+    source = PayloadStore(tmp_path / "source")
+    source.put(URL, StaticExtractor(expire=2000000000).extract(URL))
+    source.export_archive(tmp_path / "corpus.tar")
+    PayloadStore(tmp_path / "corpus").import_archive(tmp_path / "corpus.tar")
+
+    assert replay.extract(URL)["title"] == "Recorded"
@@ -0,0 +1,159 @@
+from pathlib import Path
+import asyncio
+import sys
+import threading
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from downloader.core import MediaResult
+from downloader.services import MediaService
+from downloader.services.scheduler import PriorityScheduler
+from downloader.web.app import create_app
+from downloader.web.routes import _select_lane
+from downloader.web.settings import Settings
+
+
+def recorder(order, lane, delay=0.005):
+    lock = threading.Lock()
+
+    def job():
+        with lock:
+            order.append(lane)
+        time.sleep(delay)
+        return lane
+
+    return job
+
+
+def test_lanes_share_workers_by_weight():
+    order = []
+
+    async def run():
+        scheduler = PriorityScheduler({"interactive": 3, "bulk": 1}, workers=1, max_wait=60)
+        jobs = [scheduler.run("bulk", recorder(order, "bulk")) for _ in range(8)]
+        jobs += [scheduler.run("interactive", recorder(order, "interactive")) for _ in range(8)]
+        await asyncio.gather(*jobs)
+        scheduler.close()
+
+    asyncio.run(run())
+
+    # The first bulk job grabs the idle worker; afterwards the weights apply.
+    assert order[1:9].count("interactive") == 6
+    assert len(order) == 16
+
+
+def test_starved_lane_is_served_after_max_wait():
+    order = []
+
+    async def run():
+        scheduler = PriorityScheduler({"interactive": 1000, "bulk": 1}, workers=1, max_wait=0.05)
+        jobs = [scheduler.run("interactive", recorder(order, "interactive", delay=0.02)) for _ in range(30)]
+        jobs.append(scheduler.run("bulk", recorder(order, "bulk")))
+        await asyncio.gather(*jobs)
+        scheduler.close()
+
+    asyncio.run(run())
+
+    assert order.index("bulk") < 10
+
+
+def test_cancelled_job_never_starts():
+    order = []
+
+    async def run():
+        scheduler = PriorityScheduler(workers=1)
+        first = asyncio.ensure_future(scheduler.run("bulk", recorder(order, "first", delay=0.05)))
+        second = asyncio.ensure_future(scheduler.run("bulk", recorder(order, "second")))
+        await asyncio.sleep(0.01)
+        second.cancel()
+        await first
+        await asyncio.sleep(0.05)
+        scheduler.close()
+        return scheduler.stats()
+
+    stats = asyncio.run(run())
+
+    assert order == ["first"]
+    assert stats["bulk"] == {"queued": 0, "running": 0}
+
+
+def test_bulk_burst_leaves_a_worker_for_interactive():
+    order = []
+
+    async def run():
+        scheduler = PriorityScheduler({"interactive": 4, "bulk": 1}, workers=4, reserved=1)
+        bulk = [asyncio.ensure_future(scheduler.run("bulk", recorder(order, "bulk", delay=0.5))) for _ in range(8)]
+        await asyncio.sleep(0.05)
+        running = scheduler.stats()["bulk"]["running"]
+        started = time.monotonic()
+        await scheduler.run("interactive", recorder(order, "interactive", delay=0))
+        waited = time.monotonic() - started
+        await asyncio.gather(*bulk)
+        scheduler.close()
+        return running, waited
+
+    running, waited = asyncio.run(run())
+
+    assert running == 3
+    assert waited < 0.2
+
+
+class BlockingExtractor:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def extract(self, url, cookies=None, deadline=None):
+        self.release.wait(5)
+        return {"title": "slow", "webpage_url": url, "formats": []}
+
+
+def test_cache_hits_do_not_queue_behind_extractions():
+    extractor = BlockingExtractor()
+    service = MediaService(extractor)
+    cached_url = "https://www.youtube.com/watch?v=aaaaaaaaaaa"
+    cached = MediaResult(title="cached", page_url=cached_url, video_streams=[], audio_streams=[])
+    service.cache.put("Youtube:aaaaaaaaaaa", cached, time.time() + 600, url=cached_url)
+    statuses = []
+
+    with TestClient(create_app(service, Settings(extraction_workers=1))) as client:
+        slow = threading.Thread(
+            target=lambda: statuses.append(
+                client.get("/api/streams", params={"url": "https://www.youtube.com/watch?v=bbbbbbbbbbb"}).status_code
+            )
+        )
+        slow.start()
+        time.sleep(0.1)
+        started = time.monotonic()
+        response = client.get("/api/streams", params={"url": cached_url})
+        waited = time.monotonic() - started
+        extractor.release.set()
+        slow.join(5)
+
+    assert response.status_code == 200
+    assert waited < 0.5
+    assert statuses == [200]
+
+
+def lane_for(headers, settings=None):
+    settings = settings or Settings(api_key_lanes="vip=interactive")
+    raw = [(b"host", b"app.example")] + [(k.lower().encode(), v.encode()) for k, v in headers.items()]
+    request = Request({"type": "http", "method": "POST", "path": "/api/streams", "headers": raw})
+    return _select_lane(request, settings, PriorityScheduler(settings.lane_weights), settings.post_lane)
+
+
+def test_only_the_ui_and_pinned_keys_reach_the_top_lane():
+    assert lane_for({}) == "bulk"
+    assert lane_for({"X-Priority": "interactive"}) == "bulk"
+    assert lane_for({"Sec-Fetch-Site": "same-origin"}) == "interactive"
+    assert lane_for({"Sec-Fetch-Site": "cross-site", "Origin": "https://app.example"}) == "bulk"
+    assert lane_for({"Origin": "https://app.example"}) == "interactive"
+    assert lane_for({"Origin": "https://evil.example"}) == "bulk"
+    assert lane_for({"X-API-Key": "vip"}) == "interactive"
+    # X-Priority can still lower a request's priority.
+    assert lane_for({"Sec-Fetch-Site": "same-origin", "X-Priority": "bulk"}) == "bulk"
@@ -0,0 +1,71 @@
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from downloader.core.urls import canonicalize_url
+from downloader.services import MediaService
+
+CANONICAL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://youtu.be/dQw4w9WgXcQ?si=tracking",
+        "https://m.youtube.com/watch?v=dQw4w9WgXcQ&t=30s",
+        "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+        "https://music.youtube.com/watch?v=dQw4w9WgXcQ&list=RDAMVM",
+        "https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ",
+        "HTTPS://WWW.YOUTUBE.COM/watch?feature=share&v=dQw4w9WgXcQ",
+    ],
+)
+def test_youtube_variants_share_identity(url):
+    canonical = canonicalize_url(url)
+
+    assert canonical.url == CANONICAL
+    assert canonical.extractor_key == "Youtube"
+    assert canonical.cache_key == "Youtube:dQw4w9WgXcQ"
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://example.com/video",
+        "https://www.youtube.com/playlist?list=PL123",
+        "https://youtu.be/short",
+        "https://vimeo.com/123/abcdef",
+    ],
+)
+def test_unknown_shapes_fall_back_to_raw_url(url):
+    canonical = canonicalize_url(url)
+
+    assert canonical.url == url
+    assert canonical.extractor_key is None
+    assert canonical.cache_key == url
+
+
+def test_service_caches_by_canonical_identity():
+    calls = []
+
+    class CountingExtractor:
+        def extract(self, url, cookies=None):
+            calls.append((url, cookies))
+            return {"title": "T", "webpage_url": CANONICAL, "formats": []}
+
+    service = MediaService(CountingExtractor())
+    first = service.get_media("https://youtu.be/dQw4w9WgXcQ")
+    second = service.get_media("https://m.youtube.com/watch?v=dQw4w9WgXcQ&t=30s")
+    service.get_media(CANONICAL, cookies="# Netscape HTTP Cookie File")
+
+    assert second is first
+    assert calls == [
+        ("https://youtu.be/dQw4w9WgXcQ", None),
+        (CANONICAL, "# Netscape HTTP Cookie File"),
+    ]
+    assert service.cache.hits == 1
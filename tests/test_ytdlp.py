@@ -135,3 +135,61 @@ def test_extractor_uses_inline_cookies(monkeypatch):
     assert captured["cookie_exists_during_call"] is True
     assert captured["cookie_content"] == cookies
     assert not Path(cookiefile).exists()
+
+
+def test_extract_prunes_payload_to_allowlist(monkeypatch):
+    class BulkyYoutubeDL(DummyYoutubeDL):
+        def extract_info(self, url, download, *, process=True, **kwargs):
+            super().extract_info(url, download, process=process, **kwargs)
+            return {
+                "id": "abc",
+                "title": "Title",
+                "automatic_captions": {"en": [{"url": "https://example.com/cc"}]},
+                "thumbnails": [{"url": "https://example.com/t.jpg"}],
+                "formats": [
+                    {
+                        "format_id": "18",
+                        "url": "https://example.com/18",
+                        "vcodec": "avc1",
+                        "http_headers": {"User-Agent": "x"},
+                        "fragments": [{"url": "sq/0"}],
+                    }
+                ],
+            }
+
+    monkeypatch.setattr("downloader.core.ytdlp.YoutubeDL", BulkyYoutubeDL)
+
+    result = YtDlpExtractor().extract("https://example.com/bulky")
+
+    assert result == {
+        "id": "abc",
+        "title": "Title",
+        "formats": [{"format_id": "18", "url": "https://example.com/18", "vcodec": "avc1"}],
+    }
+
+
+def test_extract_dispatches_known_urls_directly(monkeypatch):
+    captured = {}
+
+    class KeyedYoutubeDL(DummyYoutubeDL):
+        def extract_info(self, url, download, *, ie_key=None, process=True, **kwargs):
+            captured["ie_key"] = ie_key
+            return super().extract_info(url, download, process=process, **kwargs)
+
+    def fake_youtubedl(options):
+        dummy = KeyedYoutubeDL(options)
+        captured["instance"] = dummy
+        return dummy
+
+    monkeypatch.setattr("downloader.core.ytdlp.YoutubeDL", fake_youtubedl)
+
+    extractor = YtDlpExtractor()
+    extractor.extract("https://youtu.be/dQw4w9WgXcQ?t=30")
+
+    assert captured["instance"].recorded_url == "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    assert captured["ie_key"] == "Youtube"
+
+    extractor.extract("https://example.com/unknown")
+
+    assert captured["instance"].recorded_url == "https://example.com/unknown"
+    assert captured["ie_key"] is None